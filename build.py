@@ -4,23 +4,445 @@ Static blog generator for Thunderclaw website.
 Converts markdown posts with frontmatter into HTML blog pages.
 """
 
+import sys
+import importlib
+
+# Commands run by another module's main(); imported only when used so each starts fast
+COMMANDS = {
+    "digest": ("build_digest", "write weekly digest posts and rebuild"),
+    "sitemap": ("generate_sitemap", "regenerate sitemap.xml from post metadata"),
+    "serve": ("build_serve", "serve the built site without rebuilding"),
+    "bench": ("build_bench", "benchmark build stages on synthetic corpora"),
+}
+
+
+def run_command(argv):
+    """Run the module behind COMMANDS[argv[0]] with the remaining arguments."""
+    return importlib.import_module(COMMANDS[argv[0]][0]).main(argv[1:])
+
+
+# Dispatch other commands before loading the build's own dependencies
+if __name__ == "__main__" and sys.argv[1:2] and sys.argv[1] in COMMANDS:
+    sys.exit(run_command(sys.argv[1:]))
+
 import os
 import re
 import json
-import markdown
+import time
+import hashlib
+import argparse
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-import math
+from build_cache import BUILD_CACHE_DIR, RenderCache
+from build_feeds import FEED_ARCHIVE_DIR, FEED_FORMATS, FEED_ITEM_LIMIT, generate_feeds
+from build_io import build_lock, remove_output, write_output, write_stats
+from build_search import SEARCH_DIR, SEARCH_JS, build_search_index, load_post_terms
+from post_index import POSTS_DIR, FrontmatterError, load_posts
+
+# Heavy dependencies (markdown, Pygments, numpy, Pillow, multiprocessing)
+# and the helpers only a build needs (graph, profiler, minifier, sitemap,
+# compression) are imported inside the functions that use them, so
+# --help and commands that never render a page start fast.
 
 # Configuration
-POSTS_DIR = Path("posts")
 BLOG_DIR = Path("blog")
 LAB_DIR = Path("lab")
+READING_PATH = Path("reading.json")
+HOMEPAGE_PATH = Path("index.html")
+# Homepage regions patched by the build: <!-- build:NAME --> ... <!-- /build:NAME -->
+HOMEPAGE_REGION_RE = re.compile(r"<!-- build:([\w-]+) -->.*?<!-- /build:\1 -->", re.DOTALL)
+HOMEPAGE_POST_COUNT = 5
+# Post metadata shown by list pages and by the homepage
+LIST_FIELDS = ("filename", "title", "date", "description", "tags", "category", "reading_time")
+HOMEPAGE_FIELDS = ("filename", "title", "date", "category")
+# Posts per archive page; page 1 stays at /blog/ and /lab/, the rest at page/N/
+ARCHIVE_PAGE_SIZE = 25
 SITE_URL = "https://thunderclawbot.github.io"
 SITE_TITLE = "Thunderclaw ⚡ — AI Engineer"
 SITE_DESCRIPTION = "An AI building tools, reading books, and engineering in public."
+FEED_SITE = {"url": SITE_URL, "title": SITE_TITLE, "description": SITE_DESCRIPTION}
+
+# Incremental build state
+MANIFEST_PATH = BUILD_CACHE_DIR / "manifest.json"
+MANIFEST_VERSION = 1
+# Bump when generate_post_html changes output without touching POST_TEMPLATE
+RENDER_VERSION = 1
+
+# Rendered markdown bodies, shared by full and incremental builds
+RENDER_CACHE_DIR = BUILD_CACHE_DIR / "render"
+RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+MARKDOWN_EXTENSIONS = ["extra", "codehilite"]
+# Bump when process_callouts or markdown_to_html change their output
+MARKDOWN_RENDER_VERSION = 1
+
+# Highlighted code blocks, so a prose edit never re-highlights a post's code
+HIGHLIGHT_CACHE_DIR = BUILD_CACHE_DIR / "highlight"
+HIGHLIGHT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+# Highlighted blocks kept in memory per process (least recently used go first)
+HIGHLIGHT_MEMO_ENTRIES = 1024
+# Pygments color scheme for the shared highlight.css
+PYGMENTS_STYLE = "monokai"
+
+# Shared assets, written to assets/ under content-hashed names so browsers
+# and CDNs can cache them indefinitely across every page
+ASSETS_DIR = Path("assets")
+# Outdated versions of each asset kept for HTML that browsers and CDNs still cache
+ASSET_GENERATIONS_KEPT = 1
+# Targets whose pages link hashed assets; old versions are pruned once all are current
+ASSET_PAGE_TARGETS = ("pages", "archives", "search")
+# A few inline rules so the first paint has the right colors before the stylesheet loads
+INLINE_CRITICAL_CSS = True
+CRITICAL_CSS = ":root{--bg:#0a0a0f;--text:#e0e0e6}body{background:var(--bg);color:var(--text)}"
+
+# Resource hints: list pages prefetch their first few posts, post pages
+# prefetch their neighbors and prerender them once a link is hovered
+PREFETCH_LIST_COUNT = 3
+SPECULATION_EAGERNESS = "moderate"
+
+# Targets that write files, in build order (see build_targets)
+BUILD_TARGETS = ["assets", "images", "pages", "archives", "search", "homepage", "feeds", "sitemap", "compress"]
+
+# Generated outputs that get precompressed siblings with --compress
+COMPRESS_PATHS = [HOMEPAGE_PATH, BLOG_DIR, LAB_DIR, SEARCH_DIR, ASSETS_DIR, FEED_ARCHIVE_DIR,
+                  *(Path(path) for path, _ in FEED_FORMATS.values())]
+
+POST_CSS = """:root {
+    --bg: #0a0a0f;
+    --surface: #12121a;
+    --border: #1e1e2e;
+    --text: #e0e0e6;
+    --muted: #8888a0;
+    --accent: #fbbf24;
+    --accent-dim: #92702a;
+    --link: #60a5fa;
+}
+* { margin: 0; padding: 0; box-sizing: border-box; }
+body {
+    font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+    background: var(--bg);
+    color: var(--text);
+    line-height: 1.8;
+    min-height: 100vh;
+}
+.container {
+    max-width: 640px;
+    margin: 0 auto;
+    padding: 3rem 1.5rem;
+}
+.back {
+    display: inline-block;
+    color: var(--muted);
+    text-decoration: none;
+    font-size: 0.9rem;
+    margin-bottom: 2rem;
+    transition: color 0.2s;
+}
+.back:hover { color: var(--accent); }
+.meta {
+    color: var(--muted);
+    font-size: 0.85rem;
+    margin-bottom: 0.5rem;
+}
+h1 {
+    font-size: 1.8rem;
+    font-weight: 700;
+    letter-spacing: -0.03em;
+    margin-bottom: 0.5rem;
+    line-height: 1.3;
+}
+.subtitle {
+    color: var(--muted);
+    font-size: 1.05rem;
+    margin-bottom: 2.5rem;
+    font-style: italic;
+}
+article p {
+    margin-bottom: 1.5rem;
+}
+article h2 {
+    font-size: 1.2rem;
+    font-weight: 600;
+    margin: 2.5rem 0 1rem;
+    color: var(--accent);
+}
+article strong {
+    color: var(--accent);
+    font-weight: 600;
+}
+blockquote {
+    border-left: 3px solid var(--accent-dim);
+    padding-left: 1.2rem;
+    color: var(--muted);
+    font-style: italic;
+    margin: 1.5rem 0;
+}
+article ul, article ol {
+    margin-bottom: 1.5rem;
+    padding-left: 1.5rem;
+}
+article li {
+    margin-bottom: 0.5rem;
+}
+article img {
+    display: block;
+    max-width: 100%;
+    height: auto;
+    border-radius: 6px;
+}
+.callout {
+    background: var(--surface);
+    border: 1px solid var(--border);
+    border-radius: 8px;
+    padding: 1.2rem 1.5rem;
+    margin: 2rem 0;
+}
+.callout-label {
+    font-size: 0.8rem;
+    text-transform: uppercase;
+    letter-spacing: 0.1em;
+    color: var(--accent);
+    margin-bottom: 0.5rem;
+}
+code {
+    background: var(--surface);
+    padding: 0.15em 0.4em;
+    border-radius: 3px;
+    font-size: 0.9em;
+}
+.related {
+    margin-top: 3rem;
+}
+.related-label {
+    font-size: 0.8rem;
+    text-transform: uppercase;
+    letter-spacing: 0.1em;
+    color: var(--accent);
+    margin-bottom: 0.5rem;
+}
+.related ul {
+    list-style: none;
+}
+.related li {
+    margin-bottom: 0.4rem;
+}
+.related a {
+    color: var(--link);
+    text-decoration: none;
+    transition: color 0.2s;
+}
+.related a:hover { color: var(--accent); }
+.nav {
+    display: flex;
+    justify-content: space-between;
+    margin-top: 3rem;
+    padding-top: 1.5rem;
+    border-top: 1px solid var(--border);
+    font-size: 0.9rem;
+}
+.nav a {
+    color: var(--link);
+    text-decoration: none;
+    transition: color 0.2s;
+}
+.nav a:hover { color: var(--accent); }
+.nav .prev { text-align: left; }
+.nav .next { text-align: right; }
+footer {
+    margin-top: 4rem;
+    padding-top: 1.5rem;
+    border-top: 1px solid var(--border);
+    color: var(--muted);
+    font-size: 0.85rem;
+}
+footer a {
+    color: var(--link);
+    text-decoration: none;
+}
+@media (max-width: 480px) {
+    .container { padding: 2rem 1rem; }
+    h1 { font-size: 1.5rem; }
+}
+"""
+
+LIST_CSS = """:root {
+    --bg: #0a0a0f;
+    --surface: #12121a;
+    --border: #1e1e2e;
+    --text: #e0e0e6;
+    --muted: #8888a0;
+    --accent: #fbbf24;
+    --accent-dim: #92702a;
+    --link: #60a5fa;
+}
+* { margin: 0; padding: 0; box-sizing: border-box; }
+body {
+    font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+    background: var(--bg);
+    color: var(--text);
+    line-height: 1.7;
+    min-height: 100vh;
+}
+.container {
+    max-width: 640px;
+    margin: 0 auto;
+    padding: 4rem 1.5rem;
+}
+.back {
+    display: inline-block;
+    color: var(--muted);
+    text-decoration: none;
+    font-size: 0.9rem;
+    margin-bottom: 2rem;
+    transition: color 0.2s;
+}
+.back:hover { color: var(--accent); }
+h1 {
+    font-size: 2rem;
+    font-weight: 700;
+    letter-spacing: -0.03em;
+    margin-bottom: 1rem;
+}
+.tagline {
+    color: var(--muted);
+    font-size: 1.05rem;
+    margin-bottom: 1.5rem;
+}
+.filters {
+    display: flex;
+    gap: 0.5rem;
+    margin-bottom: 2rem;
+}
+.filter-btn {
+    background: var(--surface);
+    border: 1px solid var(--border);
+    color: var(--muted);
+    padding: 0.4rem 1rem;
+    border-radius: 6px;
+    cursor: pointer;
+    font-size: 0.9rem;
+    font-family: inherit;
+    transition: all 0.2s;
+}
+.filter-btn:hover {
+    color: var(--text);
+    border-color: var(--accent-dim);
+}
+.filter-btn.active {
+    background: var(--accent);
+    color: var(--bg);
+    border-color: var(--accent);
+    font-weight: 600;
+}
+.post-list {
+    list-style: none;
+}
+.post-item {
+    padding: 1.5rem 0;
+    border-bottom: 1px solid var(--border);
+}
+.post-item:last-child {
+    border-bottom: none;
+}
+.post-item.hidden {
+    display: none;
+}
+.post-date {
+    font-size: 0.85rem;
+    color: var(--muted);
+    margin-bottom: 0.3rem;
+}
+.post-title {
+    font-size: 1.3rem;
+    font-weight: 600;
+    margin-bottom: 0.5rem;
+}
+.post-title a {
+    color: var(--text);
+    text-decoration: none;
+    transition: color 0.2s;
+}
+.post-title a:hover {
+    color: var(--accent);
+}
+.post-description {
+    color: var(--muted);
+    font-size: 0.95rem;
+}
+.search-link {
+    margin-left: auto;
+    align-self: center;
+    color: var(--link);
+    text-decoration: none;
+    font-size: 0.9rem;
+}
+.search-input {
+    width: 100%;
+    background: var(--surface);
+    border: 1px solid var(--border);
+    color: var(--text);
+    padding: 0.6rem 1rem;
+    border-radius: 6px;
+    font-size: 1rem;
+    font-family: inherit;
+    margin-bottom: 1rem;
+}
+.search-input:focus {
+    outline: none;
+    border-color: var(--accent-dim);
+}
+.pagination {
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    margin-top: 2rem;
+    font-size: 0.9rem;
+    color: var(--muted);
+}
+.pagination a {
+    color: var(--link);
+    text-decoration: none;
+}
+.pagination a:hover {
+    color: var(--accent);
+}
+footer {
+    margin-top: 4rem;
+    padding-top: 1.5rem;
+    border-top: 1px solid var(--border);
+    color: var(--muted);
+    font-size: 0.85rem;
+}
+@media (max-width: 480px) {
+    .container { padding: 2rem 1rem; }
+    h1 { font-size: 1.6rem; }
+}
+"""
+
+FILTERS_JS = """document.querySelectorAll('.filter-btn').forEach(function(btn) {
+    btn.addEventListener('click', function() {
+        var filter = this.getAttribute('data-filter');
+        document.querySelectorAll('.filter-btn').forEach(function(b) { b.classList.remove('active'); });
+        this.classList.add('active');
+        document.querySelectorAll('.post-item').forEach(function(item) {
+            if (filter === 'all' || item.getAttribute('data-category') === filter) {
+                item.classList.remove('hidden');
+            } else {
+                item.classList.add('hidden');
+            }
+        });
+    });
+});
+"""
+
+ASSETS = {
+    "post.css": POST_CSS,
+    "list.css": LIST_CSS,
+    "filters.js": FILTERS_JS,
+    "search.js": SEARCH_JS,
+}
+_highlight_css_checked = False
 
-# CSS extracted from existing blog post
 POST_TEMPLATE = """<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -44,136 +466,8 @@ POST_TEMPLATE = """<!DOCTYPE html>
     <meta property="twitter:description" content="{description}">
     <meta property="twitter:image" content="{og_image}">
     
-    <style>
-        :root {{
-            --bg: #0a0a0f;
-            --surface: #12121a;
-            --border: #1e1e2e;
-            --text: #e0e0e6;
-            --muted: #8888a0;
-            --accent: #fbbf24;
-            --accent-dim: #92702a;
-            --link: #60a5fa;
-        }}
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
-            font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-            background: var(--bg);
-            color: var(--text);
-            line-height: 1.8;
-            min-height: 100vh;
-        }}
-        .container {{
-            max-width: 640px;
-            margin: 0 auto;
-            padding: 3rem 1.5rem;
-        }}
-        .back {{
-            display: inline-block;
-            color: var(--muted);
-            text-decoration: none;
-            font-size: 0.9rem;
-            margin-bottom: 2rem;
-            transition: color 0.2s;
-        }}
-        .back:hover {{ color: var(--accent); }}
-        .meta {{
-            color: var(--muted);
-            font-size: 0.85rem;
-            margin-bottom: 0.5rem;
-        }}
-        h1 {{
-            font-size: 1.8rem;
-            font-weight: 700;
-            letter-spacing: -0.03em;
-            margin-bottom: 0.5rem;
-            line-height: 1.3;
-        }}
-        .subtitle {{
-            color: var(--muted);
-            font-size: 1.05rem;
-            margin-bottom: 2.5rem;
-            font-style: italic;
-        }}
-        article p {{
-            margin-bottom: 1.5rem;
-        }}
-        article h2 {{
-            font-size: 1.2rem;
-            font-weight: 600;
-            margin: 2.5rem 0 1rem;
-            color: var(--accent);
-        }}
-        article strong {{
-            color: var(--accent);
-            font-weight: 600;
-        }}
-        blockquote {{
-            border-left: 3px solid var(--accent-dim);
-            padding-left: 1.2rem;
-            color: var(--muted);
-            font-style: italic;
-            margin: 1.5rem 0;
-        }}
-        article ul, article ol {{
-            margin-bottom: 1.5rem;
-            padding-left: 1.5rem;
-        }}
-        article li {{
-            margin-bottom: 0.5rem;
-        }}
-        .callout {{
-            background: var(--surface);
-            border: 1px solid var(--border);
-            border-radius: 8px;
-            padding: 1.2rem 1.5rem;
-            margin: 2rem 0;
-        }}
-        .callout-label {{
-            font-size: 0.8rem;
-            text-transform: uppercase;
-            letter-spacing: 0.1em;
-            color: var(--accent);
-            margin-bottom: 0.5rem;
-        }}
-        code {{
-            background: var(--surface);
-            padding: 0.15em 0.4em;
-            border-radius: 3px;
-            font-size: 0.9em;
-        }}
-        .nav {{
-            display: flex;
-            justify-content: space-between;
-            margin-top: 3rem;
-            padding-top: 1.5rem;
-            border-top: 1px solid var(--border);
-            font-size: 0.9rem;
-        }}
-        .nav a {{
-            color: var(--link);
-            text-decoration: none;
-            transition: color 0.2s;
-        }}
-        .nav a:hover {{ color: var(--accent); }}
-        .nav .prev {{ text-align: left; }}
-        .nav .next {{ text-align: right; }}
-        footer {{
-            margin-top: 4rem;
-            padding-top: 1.5rem;
-            border-top: 1px solid var(--border);
-            color: var(--muted);
-            font-size: 0.85rem;
-        }}
-        footer a {{
-            color: var(--link);
-            text-decoration: none;
-        }}
-        @media (max-width: 480px) {{
-            .container {{ padding: 2rem 1rem; }}
-            h1 {{ font-size: 1.5rem; }}
-        }}
-    </style>
+    {stylesheets}
+    {resource_hints}
 </head>
 <body>
     <div class="container">
@@ -186,7 +480,7 @@ POST_TEMPLATE = """<!DOCTYPE html>
         <article>
 {content}
         </article>
-
+{related}
         <div class="nav">
             <div class="prev">{prev_link}</div>
             <div class="next">{next_link}</div>
@@ -223,123 +517,8 @@ BLOG_INDEX_TEMPLATE = """<!DOCTYPE html>
     <meta property="twitter:description" content="{page_description}">
     <meta property="twitter:image" content="{site_url}/avatars/thunderclaw.jpg">
 
-    <style>
-        :root {{
-            --bg: #0a0a0f;
-            --surface: #12121a;
-            --border: #1e1e2e;
-            --text: #e0e0e6;
-            --muted: #8888a0;
-            --accent: #fbbf24;
-            --accent-dim: #92702a;
-            --link: #60a5fa;
-        }}
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
-            font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-            background: var(--bg);
-            color: var(--text);
-            line-height: 1.7;
-            min-height: 100vh;
-        }}
-        .container {{
-            max-width: 640px;
-            margin: 0 auto;
-            padding: 4rem 1.5rem;
-        }}
-        .back {{
-            display: inline-block;
-            color: var(--muted);
-            text-decoration: none;
-            font-size: 0.9rem;
-            margin-bottom: 2rem;
-            transition: color 0.2s;
-        }}
-        .back:hover {{ color: var(--accent); }}
-        h1 {{
-            font-size: 2rem;
-            font-weight: 700;
-            letter-spacing: -0.03em;
-            margin-bottom: 1rem;
-        }}
-        .tagline {{
-            color: var(--muted);
-            font-size: 1.05rem;
-            margin-bottom: 1.5rem;
-        }}
-        .filters {{
-            display: flex;
-            gap: 0.5rem;
-            margin-bottom: 2rem;
-        }}
-        .filter-btn {{
-            background: var(--surface);
-            border: 1px solid var(--border);
-            color: var(--muted);
-            padding: 0.4rem 1rem;
-            border-radius: 6px;
-            cursor: pointer;
-            font-size: 0.9rem;
-            font-family: inherit;
-            transition: all 0.2s;
-        }}
-        .filter-btn:hover {{
-            color: var(--text);
-            border-color: var(--accent-dim);
-        }}
-        .filter-btn.active {{
-            background: var(--accent);
-            color: var(--bg);
-            border-color: var(--accent);
-            font-weight: 600;
-        }}
-        .post-list {{
-            list-style: none;
-        }}
-        .post-item {{
-            padding: 1.5rem 0;
-            border-bottom: 1px solid var(--border);
-        }}
-        .post-item:last-child {{
-            border-bottom: none;
-        }}
-        .post-item.hidden {{
-            display: none;
-        }}
-        .post-date {{
-            font-size: 0.85rem;
-            color: var(--muted);
-            margin-bottom: 0.3rem;
-        }}
-        .post-title {{
-            font-size: 1.3rem;
-            font-weight: 600;
-            margin-bottom: 0.5rem;
-        }}
-        .post-title a {{
-            color: var(--text);
-            text-decoration: none;
-            transition: color 0.2s;
-        }}
-        .post-title a:hover {{
-            color: var(--accent);
-        }}
-        .post-description {{
-            color: var(--muted);
-            font-size: 0.95rem;
-        }}
-        footer {{
-            margin-top: 4rem;
-            padding-top: 1.5rem;
-            border-top: 1px solid var(--border);
-            color: var(--muted);
-            font-size: 0.85rem;
-        }}
-        @media (max-width: 480px) {{
-            .container {{ padding: 2rem 1rem; }}
-            h1 {{ font-size: 1.6rem; }}
-        }}
-    </style>
+    {stylesheets}{pagination_links}
+    {resource_hints}
 </head>
 <body>
     <div class="container">
@@ -353,7 +532,7 @@ BLOG_INDEX_TEMPLATE = """<!DOCTYPE html>
         <ul class="post-list">
 {posts}
         </ul>
-
+{pagination}
         <footer>
             Built by an AI, guided by a human. Powered by curiosity and Claude.
         </footer>
@@ -364,48 +543,108 @@ BLOG_INDEX_TEMPLATE = """<!DOCTYPE html>
 """
 
 
-def parse_frontmatter(content):
-    """Parse YAML frontmatter from markdown content."""
-    if not content.startswith("---"):
-        return {}, content
-    
-    parts = content.split("---", 2)
-    if len(parts) < 3:
-        return {}, content
-    
-    frontmatter_text = parts[1].strip()
-    body = parts[2].strip()
-    
-    # Simple YAML parsing (sufficient for our use case)
-    metadata = {}
-    for line in frontmatter_text.split("\n"):
-        if ":" in line:
-            key, value = line.split(":", 1)
-            key = key.strip()
-            value = value.strip()
-            
-            # Handle arrays
-            if value.startswith("[") and value.endswith("]"):
-                value = [v.strip() for v in value[1:-1].split(",")]
-            
-            # Strip surrounding quotes from values
-            if isinstance(value, str) and len(value) >= 2:
-                if (value[0] == '"' and value[-1] == '"') or (value[0] == "'" and value[-1] == "'"):
-                    value = value[1:-1]
-            
-            metadata[key] = value
-    
-    # Strip leading H1 from body (template already renders it)
-    body = re.sub(r'^#\s+.+\n+', '', body)
-    
-    return metadata, body
+def shared_assets():
+    """Return ASSETS, adding highlight.css on first use when Pygments is installed."""
+    global _highlight_css_checked
+    if not _highlight_css_checked:
+        try:
+            from pygments.formatters import HtmlFormatter
+        except ImportError:
+            pass
+        else:
+            # codehilite emits class names only, so one stylesheet serves every post
+            ASSETS["highlight.css"] = HtmlFormatter(style=PYGMENTS_STYLE).get_style_defs(".codehilite") + "\n"
+        _highlight_css_checked = True
+    return ASSETS
+
+
+def asset_filename(name):
+    """Return the content-hashed filename for a shared asset, e.g. post.1a2b3c4d5e.css."""
+    stem, ext = name.rsplit(".", 1)
+    digest = hashlib.sha256(shared_assets()[name].encode("utf-8")).hexdigest()[:10]
+    return f"{stem}.{digest}.{ext}"
+
+
+def asset_url(name):
+    """Return the site URL path of a shared asset."""
+    return f"/{ASSETS_DIR.as_posix()}/{asset_filename(name)}"
+
+
+def stylesheet_tags(name):
+    """Return the <head> markup that loads a shared stylesheet."""
+    tags = []
+    if INLINE_CRITICAL_CSS:
+        tags.append(f"<style>{CRITICAL_CSS}</style>")
+    tags.append(f'<link rel="stylesheet" href="{asset_url(name)}">')
+    return "\n    ".join(tags)
+
+
+CODEHILITE_MARKER = 'class="codehilite"'
+
+
+def highlight_stylesheet_tag(content_html):
+    """Return the <head> markup that loads highlight.css, if the page has highlighted code."""
+    if "highlight.css" not in shared_assets() or CODEHILITE_MARKER not in content_html:
+        return ""
+    return f'\n    <link rel="stylesheet" href="{asset_url("highlight.css")}">'
+
+
+def resource_hints(prefetch=(), preload=(), speculation=None):
+    """Return <head> markup hinting at the likely next navigations.
+
+    prefetch URLs go into the HTTP cache right away, preload is a list of
+    (url, as) pairs needed by this page, and speculation is a speculation
+    rules object for browsers that support them.
+    """
+    tags = [f'<link rel="prefetch" href="{url}">' for url in prefetch]
+    for url, kind in preload:
+        crossorigin = " crossorigin" if kind == "fetch" else ""
+        tags.append(f'<link rel="preload" href="{url}" as="{kind}"{crossorigin}>')
+    if speculation:
+        tags.append(f'<script type="speculationrules">{json.dumps(speculation)}</script>')
+    return "\n    ".join(tags)
+
+
+def write_assets():
+    """Write shared assets under their hashed names; outdated versions stay until prune_assets()."""
+    ASSETS_DIR.mkdir(exist_ok=True)
+    for name, content in shared_assets().items():
+        write_output(ASSETS_DIR / asset_filename(name), content)
+    print(f"✓ Wrote {len(shared_assets())} shared assets to {ASSETS_DIR}/")
 
 
-def estimate_reading_time(text):
-    """Estimate reading time based on word count (200 words per minute)."""
-    words = len(re.findall(r'\w+', text))
-    minutes = math.ceil(words / 200)
-    return max(1, minutes)
+def prune_assets():
+    """Remove outdated asset versions, keeping the ASSET_GENERATIONS_KEPT most recent.
+
+    Only call this once every generated page links the current versions;
+    the kept generations serve HTML still cached by browsers and CDNs.
+    """
+    removed = 0
+    for name in shared_assets():
+        stem, ext = name.rsplit(".", 1)
+        current = asset_filename(name)
+        outdated = sorted((p for p in ASSETS_DIR.glob(f"{stem}.*.{ext}") if p.name != current),
+                          key=lambda p: p.stat().st_mtime_ns, reverse=True)
+        for old in outdated[ASSET_GENERATIONS_KEPT:]:
+            remove_output(old)
+            removed += 1
+    if removed:
+        print(f"✓ Removed {removed} outdated assets")
+
+
+_template_version = None
+
+
+def template_version():
+    """Hash everything shared by every post page, computed on first use."""
+    global _template_version
+    if _template_version is None:
+        import markdown
+        _template_version = hashlib.sha256(
+            f"{RENDER_VERSION}\n{markdown.__version__}\n{SITE_URL}\n{stylesheet_tags('post.css')}"
+            f"{highlight_stylesheet_tag(CODEHILITE_MARKER)}\n{POST_TEMPLATE}".encode("utf-8")
+        ).hexdigest()[:16]
+    return _template_version
 
 
 def process_callouts(html):
@@ -429,17 +668,189 @@ def process_callouts(html):
     return re.sub(pattern, replace_callout, html, flags=re.DOTALL)
 
 
-def markdown_to_html(md_content):
-    """Convert markdown to HTML."""
+def _options_key(options):
+    """Hashable key for a Pygments options dict (values may be lists)."""
+    return tuple(sorted((k, repr(v)) for k, v in options.items()))
+
+
+def _install_lexer_cache():
+    """Make codehilite reuse Pygments lexers instead of building one per block.
+
+    codehilite has no hook for lexer lookup, so its module-level
+    get_lexer_by_name is swapped for a memoized version. Unknown aliases
+    are remembered too, so they fall through to guessing without another
+    registry scan.
+    """
+    from markdown.extensions import codehilite
+    if not codehilite.pygments or getattr(codehilite.get_lexer_by_name, "is_cached", False):
+        return
+    
+    lookup = codehilite.get_lexer_by_name
+    lexers = {}
+    
+    def cached_get_lexer_by_name(alias, **options):
+        key = (alias, _options_key(options))
+        if key not in lexers:
+            try:
+                lexers[key] = lookup(alias, **options)
+            except ValueError:
+                lexers[key] = None
+        if lexers[key] is None:
+            raise ValueError(f"no Pygments lexer for alias {alias!r}")
+        return lexers[key]
+    
+    cached_get_lexer_by_name.is_cached = True
+    codehilite.get_lexer_by_name = cached_get_lexer_by_name
+
+
+# RenderCache of highlighted blocks for the conversion in progress, set by markdown_to_html
+_highlight_cache = None
+
+
+def _install_highlight_cache():
+    """Make codehilite reuse the HTML of code blocks it has highlighted before.
+
+    CodeHilite.hilite is swapped for a version that looks each block up by
+    its source, language and options, first in this process's memo (the
+    HIGHLIGHT_MEMO_ENTRIES most recently used blocks) and then in the
+    on-disk highlight cache, and only runs Pygments on a miss. Without a
+    highlight cache (--no-cache) both are bypassed. The cache namespace
+    covers the Pygments version and style.
+    """
+    from markdown.extensions import codehilite
+    if not codehilite.pygments or getattr(codehilite.CodeHilite.hilite, "is_cached", False):
+        return
+    
+    hilite = codehilite.CodeHilite.hilite
+    highlighted = OrderedDict()
+    
+    def cached_hilite(self, shebang=True):
+        cache = _highlight_cache
+        if cache is None:
+            return hilite(self, shebang)
+        source = json.dumps([self.src, self.lang, shebang, self.guess_lang, self.lang_prefix,
+                             self.use_pygments, _options_key(self.options)])
+        html = highlighted.get(source)
+        if html is not None:
+            highlighted.move_to_end(source)
+            return html
+        html = cache.get(source)
+        if html is None:
+            html = hilite(self, shebang)
+            cache.put(source, html)
+        highlighted[source] = html
+        if len(highlighted) > HIGHLIGHT_MEMO_ENTRIES:
+            highlighted.popitem(last=False)
+        return html
+    
+    cached_hilite.is_cached = True
+    codehilite.CodeHilite.hilite = cached_hilite
+
+
+_pygments_formatters = {}
+
+
+def cached_html_formatter(lang_str=None, **options):
+    """Return a shared Pygments HTML formatter for these options.
+
+    Used as codehilite's pygments_formatter. lang_str is dropped so output
+    matches codehilite's default 'html' formatter.
+    """
+    key = _options_key(options)
+    formatter = _pygments_formatters.get(key)
+    if formatter is None:
+        from pygments.formatters import get_formatter_by_name
+        formatter = _pygments_formatters[key] = get_formatter_by_name("html", **options)
+    return formatter
+
+
+class MarkdownRenderer:
+    """A Markdown converter that is built once and reused for every document.
+
+    Building markdown.Markdown sets up every extension's processors, which
+    dominates render time for short posts. One instance per process is
+    reset between documents instead.
+    """
+    
+    def __init__(self, extensions=None):
+        import markdown
+        
+        _install_lexer_cache()
+        _install_highlight_cache()
+        self.md = markdown.Markdown(
+            extensions=extensions or MARKDOWN_EXTENSIONS,
+            extension_configs={"codehilite": {"pygments_formatter": cached_html_formatter}},
+        )
+    
+    def convert(self, md_content):
+        """Convert one markdown document to HTML."""
+        try:
+            return self.md.convert(md_content)
+        finally:
+            self.md.reset()
+
+
+_renderer = None
+
+
+def get_renderer():
+    """Return this process's shared MarkdownRenderer, creating it on first use."""
+    global _renderer
+    if _renderer is None:
+        _renderer = MarkdownRenderer()
+    return _renderer
+
+
+def markdown_to_html(md_content, highlight_cache=None):
+    """Convert markdown to HTML, reusing code blocks already in highlight_cache."""
+    global _highlight_cache
     # Process callouts first
     md_content = process_callouts(md_content)
     
     # Convert markdown to HTML
-    html = markdown.markdown(md_content, extensions=['extra', 'codehilite'])
+    _highlight_cache = highlight_cache
+    try:
+        html = get_renderer().convert(md_content)
+    finally:
+        _highlight_cache = None
     
     return html
 
 
+def package_version(name):
+    """Return an installed package's version, or 'none' if it is missing."""
+    from importlib import metadata
+    
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "none"
+
+
+def render_cache_namespace():
+    """Describe everything besides the body that affects markdown_to_html output."""
+    import markdown
+    
+    return json.dumps({
+        "render": MARKDOWN_RENDER_VERSION,
+        "markdown": markdown.__version__,
+        "pygments": package_version("Pygments"),
+        "extensions": MARKDOWN_EXTENSIONS,
+    }, sort_keys=True)
+
+
+def highlight_cache_namespace():
+    """Describe everything besides a code block that affects its highlighted HTML."""
+    import markdown
+    
+    return json.dumps({
+        "render": MARKDOWN_RENDER_VERSION,
+        "markdown": markdown.__version__,
+        "pygments": package_version("Pygments"),
+        "style": PYGMENTS_STYLE,
+    }, sort_keys=True)
+
+
 def format_date(date_str):
     """Format date as 'Month DD, YYYY'."""
     date = datetime.strptime(date_str, "%Y-%m-%d")
@@ -452,53 +863,34 @@ def format_date_short(date_str):
     return date.strftime("%b %d")
 
 
-def format_rfc822(date_str):
-    """Format date for RSS feed (RFC 822)."""
-    date = datetime.strptime(date_str, "%Y-%m-%d")
-    # Set time to 6:00 AM UTC
-    date = date.replace(hour=6, minute=0, second=0)
-    return date.strftime("%a, %d %b %Y %H:%M:%S +0000")
-
+def render_related(related):
+    """Render the related posts block for a post page."""
+    if not related:
+        return ""
+    items = "\n".join(
+        f'                <li><a href="{p["filename"]}">{p["title"]}</a></li>' for p in related
+    )
+    return f'''
+        <aside class="related">
+            <p class="related-label">Related posts</p>
+            <ul>
+{items}
+            </ul>
+        </aside>
+'''
 
-def load_posts():
-    """Load all markdown posts from posts/ directory."""
-    posts = []
-    
-    for md_file in sorted(POSTS_DIR.glob("*.md")):
-        with open(md_file, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        metadata, body = parse_frontmatter(content)
-        
-        # Extract filename without extension
-        slug = md_file.stem
-        
-        # Category defaults to 'library'
-        category = metadata.get("category", "library")
-        
-        post = {
-            "slug": slug,
-            "filename": f"{slug}.html",
-            "title": metadata.get("title", "Untitled"),
-            "date": metadata.get("date", ""),
-            "description": metadata.get("description", ""),
-            "tags": metadata.get("tags", []),
-            "category": category,
-            "body": body,
-            "reading_time": estimate_reading_time(body),
-        }
-        
-        posts.append(post)
-    
-    # Sort by date (newest first), then by slug descending for same-date posts
-    posts.sort(key=lambda p: (p["date"], p["slug"]), reverse=True)
-    
-    return posts
 
+def generate_post_html(post, prev_post=None, next_post=None, content_html=None, related=None, images=None):
+    """Generate HTML for a single blog post.
 
-def generate_post_html(post, prev_post=None, next_post=None):
-    """Generate HTML for a single blog post."""
-    content_html = markdown_to_html(post["body"])
+    images is the post's share of process_images() output; <img> tags with
+    processed variants become responsive <picture> elements.
+    """
+    from build_images import DEFAULT_OG_IMAGE, og_image_url, responsive_images
+    
+    if content_html is None:
+        content_html = markdown_to_html(post["body"])
+    content_html = responsive_images(content_html, images)
     
     # Generate prev/next links
     prev_link = ""
@@ -511,7 +903,13 @@ def generate_post_html(post, prev_post=None, next_post=None):
     
     # Post URL and OG image
     post_url = f"{SITE_URL}/blog/{post['filename']}"
-    og_image = f"{SITE_URL}/avatars/thunderclaw.jpg"
+    og_image = og_image_url(post["image"] or DEFAULT_OG_IMAGE, images or {}, SITE_URL, BLOG_DIR)
+    
+    # Sequential readers go to a neighbor next: fetch both, prerender on hover
+    neighbors = [p["filename"] for p in (next_post, prev_post) if p]
+    speculation = None
+    if neighbors:
+        speculation = {"prerender": [{"source": "list", "urls": neighbors, "eagerness": SPECULATION_EAGERNESS}]}
     
     # Category badge
     category_badge = ""
@@ -529,12 +927,146 @@ def generate_post_html(post, prev_post=None, next_post=None):
         url=post_url,
         og_image=og_image,
         category_badge=category_badge,
+        stylesheets=stylesheet_tags("post.css") + highlight_stylesheet_tag(content_html),
+        resource_hints=resource_hints(prefetch=neighbors, speculation=speculation),
+        related=render_related(related),
     )
     
     return html
 
 
-def generate_list_page(posts, page_title, page_description, page_tagline, page_url, show_filters=False):
+def post_link(post):
+    """Reduce a post to the fields needed to link to it."""
+    return {"filename": post["filename"], "title": post["title"]}
+
+
+def post_fingerprint(post, prev_post=None, next_post=None, related=None, images=None, minify=None):
+    """Hash every input that affects a post's rendered HTML; minify is the MINIFY_VERSION in use, if any."""
+    neighbors = [post_link(p) if p else None for p in (prev_post, next_post)]
+    payload = json.dumps(
+        {
+            "template": template_version(),
+            # Includes body_hash, so the body itself never has to be read
+            "frontmatter": {k: v for k, v in post.items() if k != "body"},
+            "neighbors": neighbors,
+            "related": related or [],
+            "images": images or {},
+            "minify": minify,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_post(post, prev_post=None, next_post=None, related=None, images=None, cache=None, minify=False,
+                highlight_cache=None):
+    """Render a post, serving its body from the render cache when possible.
+
+    On a render cache miss, code blocks still come from highlight_cache.
+
+    Returns (html, cache_hit, timing, saved), where timing is (pid, start,
+    seconds, cpu_seconds, allocated) for the build profiler and saved is
+    the bytes minify removed. allocated is the net bytes tracemalloc saw
+    allocated, or None when it isn't tracing.
+    """
+    import tracemalloc
+    
+    tracing = tracemalloc.is_tracing()
+    size_before = tracemalloc.get_traced_memory()[0] if tracing else 0
+    start = time.time()
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    content_html = cache.get(post["body"]) if cache else None
+    cache_hit = content_html is not None
+    if not cache_hit:
+        content_html = markdown_to_html(post["body"], highlight_cache)
+        if cache:
+            cache.put(post["body"], content_html)
+    html = generate_post_html(post, prev_post, next_post, content_html, related, images)
+    saved = 0
+    if minify:
+        from build_minify import bytes_saved, minify_html
+        minified = minify_html(html)
+        saved = bytes_saved(html, minified)
+        html = minified
+    timing = (os.getpid(), start, time.perf_counter() - started, time.process_time() - cpu_started,
+              tracemalloc.get_traced_memory()[0] - size_before if tracing else None)
+    return html, cache_hit, timing, saved
+
+
+def post_content_html(post, cache=None, highlight_cache=None):
+    """Return a post's rendered body, from the render cache when it has it."""
+    content_html = cache.get(post["body"]) if cache else None
+    return content_html if content_html is not None else markdown_to_html(post["body"], highlight_cache)
+
+
+def _render_post_job(job):
+    """Process-pool entry point: render one (post, prev, next, related, images, cache, minify, highlight_cache) job."""
+    return render_post(*job)
+
+
+def render_posts(jobs, workers=1, cache=None, minify=False, highlight_cache=None):
+    """Render (post, prev, next, related, images) jobs, yielding render_post results in job order.
+
+    With more than one worker the jobs are spread across a process pool;
+    results still come back in the order the jobs were given.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield render_post(*job, cache, minify, highlight_cache)
+        return
+    
+    from concurrent.futures import ProcessPoolExecutor
+    
+    import tracemalloc
+    
+    workers = min(workers, len(jobs))
+    chunksize = max(1, len(jobs) // (workers * 4))
+    # While profiling, workers trace allocations too so every post reports them
+    initializer = tracemalloc.start if tracemalloc.is_tracing() else None
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer) as pool:
+        yield from pool.map(_render_post_job, [(*job, cache, minify, highlight_cache) for job in jobs], chunksize=chunksize)
+
+
+def load_manifest():
+    """Load the build manifest, or an empty one if missing or stale."""
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("template") != template_version():
+        return {}
+    return manifest.get("posts", {})
+
+
+def save_manifest(fingerprints):
+    """Persist per-post fingerprints for the next incremental build."""
+    BUILD_CACHE_DIR.mkdir(exist_ok=True)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "template": template_version(),
+        "posts": fingerprints,
+    }
+    write_output(MANIFEST_PATH, json.dumps(manifest, indent=1, sort_keys=True))
+
+
+def list_resource_hints(posts):
+    """Prefetch the top posts of a list page and the post stylesheet they share."""
+    prefetch = [f'/blog/{p["filename"]}' for p in posts[:PREFETCH_LIST_COUNT]]
+    if posts:
+        prefetch.append(asset_url("post.css"))
+    speculation = {"prefetch": [{
+        "source": "document",
+        "where": {"href_matches": "/blog/*"},
+        "eagerness": SPECULATION_EAGERNESS,
+    }]}
+    return resource_hints(prefetch=prefetch, speculation=speculation)
+
+
+def generate_list_page(posts, page_title, page_description, page_tagline, page_url, show_filters=False,
+                       pagination_links="", pagination=""):
     """Generate a list page for a set of posts."""
     post_items = []
 
@@ -559,23 +1091,9 @@ def generate_list_page(posts, page_title, page_description, page_tagline, page_u
             <button class="filter-btn active" data-filter="all">All ({len(posts)})</button>
             <button class="filter-btn" data-filter="lab">Lab ({lab_count})</button>
             <button class="filter-btn" data-filter="library">Library ({library_count})</button>
+            <a class="search-link" href="/search/">Search →</a>
         </div>'''
-        filter_script = '''    <script>
-        document.querySelectorAll('.filter-btn').forEach(function(btn) {
-            btn.addEventListener('click', function() {
-                var filter = this.getAttribute('data-filter');
-                document.querySelectorAll('.filter-btn').forEach(function(b) { b.classList.remove('active'); });
-                this.classList.add('active');
-                document.querySelectorAll('.post-item').forEach(function(item) {
-                    if (filter === 'all' || item.getAttribute('data-category') === filter) {
-                        item.classList.remove('hidden');
-                    } else {
-                        item.classList.add('hidden');
-                    }
-                });
-            });
-        });
-    </script>'''
+        filter_script = f'    <script src="{asset_url("filters.js")}"></script>'
 
     html = BLOG_INDEX_TEMPLATE.format(
         posts="\n".join(post_items),
@@ -586,111 +1104,196 @@ def generate_list_page(posts, page_title, page_description, page_tagline, page_u
         page_url=page_url,
         filters=filters_html,
         filter_script=filter_script,
+        stylesheets=stylesheet_tags("list.css"),
+        resource_hints=list_resource_hints(posts),
+        pagination_links=pagination_links,
+        pagination=pagination,
     )
     return html
 
 
+def archive_page_path(page):
+    """Return an archive page's output path relative to its section directory."""
+    return Path("index.html") if page == 1 else Path("page") / str(page) / "index.html"
+
+
+def archive_page_url(base_url, page):
+    """Return an archive page's URL path, e.g. /blog/ or /blog/page/2/."""
+    return base_url if page == 1 else f"{base_url}page/{page}/"
+
+
+def generate_archive_pages(posts, base_url, page_title, page_description, page_tagline,
+                           show_filters=False, page_size=ARCHIVE_PAGE_SIZE):
+    """Generate a paginated archive, newest posts first.
+
+    Returns a list of (relative output path, html), one per page. Filters
+    on each page only act on that page's posts.
+    """
+    chunks = [posts[i:i + page_size] for i in range(0, len(posts), page_size)] or [[]]
+    page_count = len(chunks)
+    pages = []
+    
+    for page, chunk in enumerate(chunks, 1):
+        prev_url = archive_page_url(base_url, page - 1) if page > 1 else None
+        next_url = archive_page_url(base_url, page + 1) if page < page_count else None
+        
+        pagination_links = ""
+        pagination = ""
+        if page_count > 1:
+            if prev_url:
+                pagination_links += f'\n    <link rel="prev" href="{SITE_URL}{prev_url}">'
+            if next_url:
+                pagination_links += f'\n    <link rel="next" href="{SITE_URL}{next_url}">'
+            newer = f'<a href="{prev_url}" rel="prev">← Newer</a>' if prev_url else "<span></span>"
+            older = f'<a href="{next_url}" rel="next">Older →</a>' if next_url else "<span></span>"
+            pagination = f'''
+        <nav class="pagination">
+            {newer}
+            <span>Page {page} of {page_count}</span>
+            {older}
+        </nav>
+'''
+        
+        html = generate_list_page(
+            chunk,
+            page_title=page_title if page == 1 else f"{page_title} — Page {page}",
+            page_description=page_description,
+            page_tagline=page_tagline,
+            page_url=f"{SITE_URL}{archive_page_url(base_url, page)}",
+            show_filters=show_filters,
+            pagination_links=pagination_links,
+            pagination=pagination,
+        )
+        pages.append((archive_page_path(page), html))
+    
+    return pages
+
+
 def generate_blog_index(posts):
-    """Generate the blog archive page (all posts)."""
-    return generate_list_page(
+    """Generate the blog archive pages (all posts)."""
+    return generate_archive_pages(
         posts,
+        base_url="/blog/",
         page_title="Blog Archive",
         page_description="All blog posts from Thunderclaw — an AI building and learning in public.",
         page_tagline="All posts from Thunderclaw — builds, books, and honest takes.",
-        page_url=f"{SITE_URL}/blog/",
         show_filters=True,
     )
 
 
 def generate_lab_index(posts):
-    """Generate the lab index page (lab posts only)."""
+    """Generate the lab index pages (lab posts only)."""
     lab_posts = [p for p in posts if p["category"] == "lab"]
-    return generate_list_page(
+    return generate_archive_pages(
         lab_posts,
+        base_url="/lab/",
         page_title="The Lab",
         page_description="Builds, tools, and experiments from Thunderclaw.",
         page_tagline="Builds, tools, and experiments. Things I made and what I learned making them.",
-        page_url=f"{SITE_URL}/lab/",
     )
 
 
-def update_index_html(posts):
-    """Update the homepage sections in index.html with latest posts."""
-    index_path = Path("index.html")
+def generate_search_page():
+    """Generate the search page; results are filled in client-side from search/."""
+    return BLOG_INDEX_TEMPLATE.format(
+        posts="",
+        site_url=SITE_URL,
+        page_title="Search",
+        page_description="Search every post from Thunderclaw.",
+        page_tagline="Search every post — builds, books, and honest takes.",
+        page_url=f"{SITE_URL}/search/",
+        filters='''        <form action="/search/" role="search" onsubmit="return false">
+            <input id="search-input" class="search-input" type="search" name="q" placeholder="Search posts..." autocomplete="off" autofocus>
+        </form>''',
+        filter_script=f'    <script src="{asset_url("search.js")}"></script>',
+        stylesheets=stylesheet_tags("list.css"),
+        resource_hints=resource_hints(preload=[(f"/{SEARCH_DIR.as_posix()}/docs.json", "fetch")]),
+        pagination_links="",
+        pagination="",
+    )
+
+
+def write_archive(directory, pages, minify=False):
+    """Write archive pages under directory and remove pages past the last one.
+
+    Returns the bytes minify removed.
+    """
+    saved = 0
+    for path, html in pages:
+        if minify:
+            from build_minify import bytes_saved, minify_html
+            minified = minify_html(html)
+            saved += bytes_saved(html, minified)
+            html = minified
+        output_path = directory / path
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        write_output(output_path, html)
     
-    with open(index_path, "r", encoding="utf-8") as f:
-        content = f.read()
+    for stale in (directory / "page").glob("*/index.html"):
+        if not stale.parent.name.isdigit() or int(stale.parent.name) <= len(pages):
+            continue
+        remove_output(stale)
+        if not any(stale.parent.iterdir()):
+            stale.parent.rmdir()
     
-    lab_posts = [p for p in posts if p["category"] == "lab"]
-    library_posts = [p for p in posts if p["category"] == "library"]
-    
-    # Generate lab post list HTML (show latest 5)
-    lab_items = []
-    for post in lab_posts[:5]:
+    extra = f" (+{len(pages) - 1} more pages)" if len(pages) > 1 else ""
+    if minify:
+        extra += f", {saved / 1024:.1f} KiB saved by minifying"
+    print(f"✓ Generated {directory.as_posix()}/index.html{extra}")
+    return saved
+
+
+def render_post_links(posts):
+    """Render homepage list items for the latest posts."""
+    items = []
+    for post in posts[:HOMEPAGE_POST_COUNT]:
         item = f'''                <li><a href="/blog/{post["filename"]}"><span class="title">{post["title"]}</span><span class="date">{format_date_short(post["date"])}</span></a></li>'''
-        lab_items.append(item)
+        items.append(item)
+    return "\n".join(items)
+
+
+def render_lab_section(posts):
+    """Render the homepage Lab section."""
+    lab_posts = [p for p in posts if p["category"] == "lab"]
     
-    if not lab_items:
+    lab_html = render_post_links(lab_posts)
+    if not lab_html:
         lab_html = '                <li class="empty-note">First lab post coming soon.</li>'
-    else:
-        lab_html = "\n".join(lab_items)
     
     lab_total = len(lab_posts)
-    lab_view_all = f'<a href="/lab/" class="view-all">View all {lab_total} lab posts →</a>' if lab_total > 5 else '<a href="/lab/" class="view-all">View all lab posts →</a>'
+    lab_view_all = f'<a href="/lab/" class="view-all">View all {lab_total} lab posts →</a>' if lab_total > HOMEPAGE_POST_COUNT else '<a href="/lab/" class="view-all">View all lab posts →</a>'
     
-    lab_section = f'''<section>
+    return f'''<section>
             <h2>🔬 Latest from the Lab</h2>
             <ul class="post-list">
 {lab_html}
             </ul>
             {lab_view_all}
         </section>'''
+
+
+def render_library_section(posts):
+    """Render the homepage Library section."""
+    library_posts = [p for p in posts if p["category"] == "library"]
     
-    # Generate library post list HTML (show latest 5)
-    library_items = []
-    for post in library_posts[:5]:
-        item = f'''                <li><a href="/blog/{post["filename"]}"><span class="title">{post["title"]}</span><span class="date">{format_date_short(post["date"])}</span></a></li>'''
-        library_items.append(item)
-    
-    library_html = "\n".join(library_items)
-    library_total = len(library_posts)
-    
-    library_section = f'''<section>
+    return f'''<section>
             <h2>📚 From the Library</h2>
             <ul class="post-list">
-{library_html}
+{render_post_links(library_posts)}
             </ul>
-            <a href="/blog/" class="view-all">View all {library_total} posts →</a>
+            <a href="/blog/" class="view-all">View all {len(library_posts)} posts →</a>
         </section>'''
-    
-    # Replace the Lab section
-    pattern = r'<section>\s*<h2>🔬 Latest from the Lab</h2>.*?</section>'
-    content = re.sub(pattern, lab_section, content, flags=re.DOTALL)
-    
-    # Replace the Library section
-    pattern = r'<section>\s*<h2>📚 From the Library</h2>.*?</section>'
-    content = re.sub(pattern, library_section, content, flags=re.DOTALL)
-    
-    with open(index_path, "w", encoding="utf-8") as f:
-        f.write(content)
-    
-    print(f"✓ Updated index.html — Lab: {len(lab_posts[:5])} shown ({lab_total} total), Library: {len(library_posts[:5])} shown ({library_total} total)")
 
 
-def update_reading_section():
-    """Update the Currently Reading section in index.html from reading.json."""
-    reading_path = Path("reading.json")
-    if not reading_path.exists():
+def render_reading_section():
+    """Render the Currently Reading section from reading.json, or None if it is missing."""
+    if not READING_PATH.exists():
         print("⚠ reading.json not found, skipping reading section update")
-        return
+        return None
     
-    with open(reading_path, "r", encoding="utf-8") as f:
+    with open(READING_PATH, "r", encoding="utf-8") as f:
         books = json.load(f)
     
-    index_path = Path("index.html")
-    with open(index_path, "r", encoding="utf-8") as f:
-        content = f.read()
-    
     # Generate reading list items
     reading_items = []
     for book in books:
@@ -709,112 +1312,480 @@ def update_reading_section():
     
     reading_html = "\n".join(reading_items)
     
-    reading_section = f'''        <section>
+    return f'''<section>
             <h2>Currently Reading</h2>
             <ul class="reading-list">
 {reading_html}
             </ul>
         </section>'''
+
+
+def update_homepage(sections):
+    """Replace marked regions of index.html in one pass and write it once.
+
+    Regions look like <!-- build:NAME --> ... <!-- /build:NAME -->; sections
+    maps NAME to the HTML that goes between the markers, or to a function
+    returning it that is only called if the page has that region. Sections
+    whose value is None, or whose markers are missing, are left alone; a
+    missing region only warns when HTML for it was passed in.
+    """
+    with open(HOMEPAGE_PATH, "r", encoding="utf-8") as f:
+        content = f.read()
+    
+    patched = set()
     
-    pattern = r'<section>\s*<h2>Currently Reading</h2>.*?</section>'
-    content = re.sub(pattern, reading_section, content, flags=re.DOTALL)
+    def replace_region(match):
+        name = match.group(1)
+        html = sections.get(name)
+        if callable(html):
+            html = html()
+        if html is None:
+            return match.group(0)
+        patched.add(name)
+        return f"<!-- build:{name} -->\n        {html}\n        <!-- /build:{name} -->"
     
-    with open(index_path, "w", encoding="utf-8") as f:
-        f.write(content)
+    content = HOMEPAGE_REGION_RE.sub(replace_region, content)
+    write_output(HOMEPAGE_PATH, content)
     
-    print(f"✓ Updated reading section with {len(books)} books")
+    for name in sections.keys() - patched:
+        if isinstance(sections[name], str):
+            print(f"⚠ No <!-- build:{name} --> region in {HOMEPAGE_PATH}, skipping {name} section")
+    return patched
 
 
-def generate_rss_feed(posts):
-    """Generate RSS feed with all posts."""
-    items = []
+def update_index_html(posts):
+    """Update the homepage sections in index.html with latest posts and reading list."""
+    patched = update_homepage({
+        "lab": render_lab_section(posts),
+        "library": render_library_section(posts),
+        "reading": render_reading_section,  # index.html may not have a reading list
+    })
     
-    for post in posts:
-        item = f'''    <item>
-      <title>{post["title"]}</title>
-      <link>{SITE_URL}/blog/{post["filename"]}</link>
-      <guid>{SITE_URL}/blog/{post["filename"]}</guid>
-      <pubDate>{format_rfc822(post["date"])}</pubDate>
-      <description>{post["description"]}</description>
-      <category>{post["category"]}</category>
-    </item>'''
-        items.append(item)
+    lab_total = sum(1 for p in posts if p["category"] == "lab")
+    library_total = sum(1 for p in posts if p["category"] == "library")
+    print(f"✓ Updated index.html ({', '.join(sorted(patched))}) — Lab: {min(lab_total, HOMEPAGE_POST_COUNT)} shown ({lab_total} total), Library: {min(library_total, HOMEPAGE_POST_COUNT)} shown ({library_total} total)")
+
+
+def parse_args(argv=None):
+    """Parse build command-line options."""
+    parser = argparse.ArgumentParser(
+        description="Build the Thunderclaw blog.",
+        epilog="other commands (see COMMAND --help): "
+               + "; ".join(f"{name}: {summary}" for name, (_, summary) in COMMANDS.items()),
+    )
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["build", "watch", *COMMANDS],
+        default="build",
+        help="build once (default), or watch sources and serve with live reload",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="rebuild every target and re-render every post, ignoring recorded inputs and the build manifest",
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="render posts in N worker processes (0 = one per CPU core)",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        choices=BUILD_TARGETS,
+        metavar="TARGET",
+        help=f"build only this target, if its inputs changed (repeatable; one of: {', '.join(BUILD_TARGETS)})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="don't read or write the rendered markdown and highlighted code caches",
+    )
+    parser.add_argument(
+        "--feed-items",
+        type=int,
+        default=FEED_ITEM_LIMIT,
+        metavar="N",
+        help=f"posts per feed and feed archive page (default: {FEED_ITEM_LIMIT}, 0 = all posts, no archive)",
+    )
+    parser.add_argument(
+        "--feed-full-content",
+        action="store_true",
+        help="include full post HTML in the subscription feeds",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="minify generated HTML and its inline CSS/JS (code blocks are left intact)",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="write .gz (and .br, with brotli installed) siblings of changed text outputs",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="report wall/CPU time and allocations per build phase and the slowest posts",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        metavar="N",
+        help="number of slowest posts to list with --profile (default: 10)",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="write a Chrome trace (JSON) of build phases and post renders; implies --profile",
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="FILE",
+        help="run the build under cProfile and dump stats to FILE",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="port for the watch-mode preview server (default: 8000)",
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or a positive number")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    if args.feed_items < 0:
+        parser.error("--feed-items must be 0 or a positive number")
+    if args.trace:
+        args.profile = True
+    return args
+
+
+def build_code_paths():
+    """Return the source files of the build itself."""
+    code_dir = Path(__file__).resolve().parent
+    return [*code_dir.glob("build*.py"), code_dir / "post_index.py", code_dir / "generate_sitemap.py"]
+
+
+def build_version():
+    """Hash the build code and the renderers it uses; a change makes every target dirty."""
+    digest = hashlib.sha256()
+    for path in sorted(build_code_paths()):
+        digest.update(path.read_bytes())
+    for name in ("Markdown", "Pygments", "Pillow"):
+        digest.update(f"{name}={package_version(name)}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def post_summary(post, fields=LIST_FIELDS):
+    """Reduce a post to the metadata a page that lists it depends on."""
+    return {k: post[k] for k in fields}
+
+
+def build_targets(args, profiler):
+    """Declare the build's targets, their inputs and the order they must run in."""
+    from build_compress import compress_outputs
+    from build_graph import Target
+    from build_images import IMAGE_CACHE_PATH, image_inputs, post_images, process_images
+    from build_minify import MINIFY_VERSION, bytes_saved, minify_html
+    from generate_sitemap import SITEMAP_PATH, generate_sitemap, sitemap_urls
     
-    feed = f'''<?xml version="1.0" encoding="UTF-8"?>
-<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
-  <channel>
-    <title>{SITE_TITLE}</title>
-    <link>{SITE_URL}</link>
-    <description>{SITE_DESCRIPTION}</description>
-    <language>en-us</language>
-    <atom:link href="{SITE_URL}/feed.xml" rel="self" type="application/rss+xml"/>
-{chr(10).join(items)}
-  </channel>
-</rss>
-'''
+    cache = highlight_cache = None
+    if not args.no_cache:
+        cache = RenderCache(RENDER_CACHE_DIR, render_cache_namespace(), RENDER_CACHE_MAX_BYTES)
+        highlight_cache = RenderCache(HIGHLIGHT_CACHE_DIR, highlight_cache_namespace(), HIGHLIGHT_CACHE_MAX_BYTES)
+    minify = MINIFY_VERSION if args.minify else None
     
-    with open("feed.xml", "w", encoding="utf-8") as f:
-        f.write(feed)
+    def posts(graph):
+        with profiler.phase("load posts"):
+            posts = load_posts()
+        print(f"✓ Loaded {len(posts)} posts")
+        lab_count = sum(1 for p in posts if p["category"] == "lab")
+        print(f"  → {lab_count} lab posts, {len(posts) - lab_count} library posts")
+        return posts
     
-    print(f"✓ Generated feed.xml with {len(posts)} posts")
-
-
-def main():
-    """Main build process."""
-    print("🔨 Building Thunderclaw blog...")
+    # Each target gets the values it needs before its phase starts, so a
+    # dependency that runs on demand is profiled as its own phase
+    def terms(graph):
+        # Post terms feed both the search index and related posts
+        posts = graph.value("posts")
+        with profiler.phase("post terms"):
+            return load_post_terms(posts)
     
-    # Create directories
-    BLOG_DIR.mkdir(exist_ok=True)
-    LAB_DIR.mkdir(exist_ok=True)
+    def related(graph):
+        posts, terms = graph.value("posts"), graph.value("terms")
+        with profiler.phase("related posts"):
+            from build_related import compute_related  # numpy
+            return compute_related(posts, terms)
     
-    # Load all posts
-    posts = load_posts()
-    print(f"✓ Loaded {len(posts)} posts")
+    def assets(graph):
+        # Shared stylesheets and scripts referenced by every generated page
+        with profiler.phase("assets"):
+            write_assets()
     
-    lab_count = sum(1 for p in posts if p["category"] == "lab")
-    library_count = sum(1 for p in posts if p["category"] == "library")
-    print(f"  → {lab_count} lab posts, {library_count} library posts")
+    def images(graph):
+        # Resized and modern-format variants of every image posts reference
+        posts = graph.value("posts")
+        with profiler.phase("images"):
+            return process_images(posts, BLOG_DIR)
     
-    # Generate individual post HTML files
-    for i, post in enumerate(posts):
-        prev_post = posts[i + 1] if i + 1 < len(posts) else None
-        next_post = posts[i - 1] if i > 0 else None
-        
-        html = generate_post_html(post, prev_post, next_post)
+    def pages(graph):
+        posts = graph.value("posts")
+        related_by_post = graph.value("related")
+        images = graph.value("images")
+        posts_by_filename = {p["filename"]: p for p in posts}
         
-        output_path = BLOG_DIR / post["filename"]
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(html)
+        # Generate individual post HTML files, skipping posts whose inputs are unchanged
+        with profiler.phase("fingerprint posts"):
+            manifest = {} if args.force else load_manifest()
+            fingerprints = {}
+            jobs = []
+            for i, post in enumerate(posts):
+                # Other posts only contribute a link, so don't ship their bodies to workers
+                prev_post = post_link(posts[i + 1]) if i + 1 < len(posts) else None
+                next_post = post_link(posts[i - 1]) if i > 0 else None
+                related = [post_link(posts_by_filename[f]) for f in related_by_post.get(post["filename"], [])]
+                page_images = post_images(post, images)
+                
+                output_path = BLOG_DIR / post["filename"]
+                fingerprint = post_fingerprint(post, prev_post, next_post, related, page_images, minify)
+                fingerprints[post["filename"]] = fingerprint
+                if manifest.get(post["filename"]) == fingerprint and output_path.exists():
+                    continue
+                
+                jobs.append((post, prev_post, next_post, related, page_images))
         
-        print(f"  ✓ Generated {post['filename']}")
+        with profiler.phase("render posts"):
+            cache_hits = 0
+            minified_bytes = 0
+            results = render_posts(jobs, args.jobs, cache, args.minify, highlight_cache)
+            for (post, *_), (html, cache_hit, timing, saved) in zip(jobs, results):
+                output_path = BLOG_DIR / post["filename"]
+                write_output(output_path, html)
+                cache_hits += cache_hit
+                minified_bytes += saved
+                profiler.record_post(post["filename"], timing)
+                
+                minified = f" ({saved / 1024:.1f} KiB saved by minifying)" if args.minify else ""
+                print(f"  ✓ Generated {post['filename']}{minified}")
+            
+            save_manifest(fingerprints)
+        print(f"✓ Rendered {len(jobs)} posts ({len(posts) - len(jobs)} unchanged)")
+        if cache and jobs:
+            with profiler.phase("render cache eviction"):
+                evicted = cache.evict()
+                highlight_cache.evict()
+            cache_misses = len(jobs) - cache_hits
+            print(f"  → render cache: {cache_hits} hits, {cache_misses} misses "
+                  f"({cache_hits / len(jobs):.0%} hit rate, {evicted} evicted)")
+        return minified_bytes
+    
+    def archives(graph):
+        # Generate blog archive pages (all posts) and lab archive pages
+        posts = graph.value("posts")
+        with profiler.phase("archive pages"):
+            minified_bytes = write_archive(BLOG_DIR, generate_blog_index(posts), args.minify)
+            minified_bytes += write_archive(LAB_DIR, generate_lab_index(posts), args.minify)
+        return minified_bytes
+    
+    def search(graph):
+        # Generate search index shards and the search page
+        minified_bytes = 0
+        posts, terms = graph.value("posts"), graph.value("terms")
+        with profiler.phase("search index"):
+            build_search_index(posts, terms)
+            search_page = generate_search_page()
+            if args.minify:
+                minified = minify_html(search_page)
+                minified_bytes = bytes_saved(search_page, minified)
+                search_page = minified
+            write_output(SEARCH_DIR / "index.html", search_page)
+        print("✓ Generated search/index.html")
+        return minified_bytes
+    
+    def homepage(graph):
+        # Update main index.html (lab, library and reading sections in one pass)
+        posts = graph.value("posts")
+        with profiler.phase("homepage"):
+            update_index_html(posts)
+    
+    def feeds(graph):
+        # Generate RSS, Atom and JSON feeds, reusing rendered post bodies for full content
+        posts = graph.value("posts")
+        with profiler.phase("feeds"):
+            content_html = (lambda post: post_content_html(post, cache, highlight_cache)) if args.feed_full_content else None
+            generate_feeds(posts, FEED_SITE, args.feed_items, content_html)
+    
+    def sitemap(graph):
+        posts = graph.value("posts")
+        with profiler.phase("sitemap"):
+            generate_sitemap(posts, compress=args.compress)
     
-    # Generate blog index page (all posts)
-    blog_index_html = generate_blog_index(posts)
-    with open(BLOG_DIR / "index.html", "w", encoding="utf-8") as f:
-        f.write(blog_index_html)
-    print("✓ Generated blog/index.html")
+    def compress(graph):
+        # Precompress changed outputs for hosts that serve .gz/.br siblings
+        with profiler.phase("compress"):
+            compress_outputs(COMPRESS_PATHS, args.jobs)
     
-    # Generate lab index page
-    lab_index_html = generate_lab_index(posts)
-    with open(LAB_DIR / "index.html", "w", encoding="utf-8") as f:
-        f.write(lab_index_html)
-    print("✓ Generated lab/index.html")
+    def summaries(graph, fields=LIST_FIELDS):
+        return [post_summary(p, fields) for p in graph.value("posts")]
     
-    # Update main index.html
-    update_index_html(posts)
+    def file_hash(path):
+        if not path.exists():
+            return None
+        return hashlib.sha256(path.read_bytes()).hexdigest()
     
-    # Update reading section from reading.json
-    update_reading_section()
+    feed_fields = (*LIST_FIELDS, "body_hash") if args.feed_full_content else LIST_FIELDS
+    targets = [
+        Target("posts", posts),
+        Target("terms", terms),
+        Target("related", related),
+        Target("assets", assets,
+               inputs=lambda g: {name: asset_filename(name) for name in shared_assets()},
+               outputs=lambda g: [ASSETS_DIR / asset_filename(name) for name in shared_assets()]),
+        Target("images", images,
+               inputs=lambda g: image_inputs(g.value("posts"), BLOG_DIR),
+               outputs=lambda g: [IMAGE_CACHE_PATH]),
+        # A post page shows its neighbors' and related posts' titles, and
+        # related posts come from every post's terms, so pages depend on all
+        # post metadata (which includes body hashes)
+        Target("pages", pages,
+               inputs=lambda g: {
+                   "template": template_version(),
+                   "minify": minify,
+                   "posts": [{k: v for k, v in p.items() if k != "body"} for p in g.value("posts")],
+                   "images": g.key("images"),
+               },
+               outputs=lambda g: [MANIFEST_PATH, *(BLOG_DIR / p["filename"] for p in g.value("posts"))]),
+        Target("archives", archives,
+               inputs=lambda g: {"posts": summaries(g), "minify": minify},
+               outputs=lambda g: [BLOG_DIR / "index.html", LAB_DIR / "index.html"]),
+        Target("search", search,
+               inputs=lambda g: {"posts": summaries(g, (*LIST_FIELDS, "body_hash")), "minify": minify},
+               outputs=lambda g: [SEARCH_DIR / "index.html"]),
+        # index.html is hand-edited around its build regions, so the page
+        # itself (as the last build left it) is an input too
+        Target("homepage", homepage,
+               inputs=lambda g: {"posts": summaries(g, HOMEPAGE_FIELDS), "reading": file_hash(READING_PATH),
+                                 "page": file_hash(HOMEPAGE_PATH)},
+               outputs=lambda g: [HOMEPAGE_PATH],
+               rehash=True),
+        # Full-content feeds reuse the bodies pages put in the render cache
+        Target("feeds", feeds,
+               inputs=lambda g: {"posts": summaries(g, feed_fields), "items": args.feed_items, "site": FEED_SITE},
+               outputs=lambda g: [Path(path) for path, _ in FEED_FORMATS.values()],
+               after=["pages"] if args.feed_full_content else []),
+        # Dates of static pages come from their mtimes, so wait for the homepage
+        Target("sitemap", sitemap,
+               inputs=lambda g: {"urls": sitemap_urls(g.value("posts")), "compress": args.compress},
+               outputs=lambda g: [SITEMAP_PATH],
+               after=["homepage"]),
+    ]
+    if args.compress or "compress" in (args.only or []):
+        targets.append(Target("compress", compress, outputs=lambda g: [],
+                              after=[t.name for t in targets if t.outputs is not None]))
+    return targets
+
+
+def build(args):
+    """Main build process: bring every selected target up to date."""
+    from build_graph import BuildGraph
+    from build_profile import BuildProfiler
+    
+    print("🔨 Building Thunderclaw blog...")
+    stats_before = dict(write_stats)
+    profiler = BuildProfiler(enabled=args.profile)
+    
+    # Create directories
+    BLOG_DIR.mkdir(exist_ok=True)
+    LAB_DIR.mkdir(exist_ok=True)
     
-    # Generate RSS feed
-    generate_rss_feed(posts)
+    # Overlapping targets would blur per-phase profiles, so profile one at a time
+    with profiler.phase("setup"):
+        graph = BuildGraph(build_targets(args, profiler), build_version(), force=args.force,
+                           concurrent=not args.profile, phase=profiler.phase)
+    built, skipped = graph.run(args.only)
+    if skipped:
+        print(f"✓ Up to date: {', '.join(skipped)}")
+    if set(ASSET_PAGE_TARGETS) <= {*built, *skipped}:
+        with profiler.phase("prune assets"):
+            prune_assets()
     
+    posts = graph.value("posts")
+    lab_count = sum(1 for p in posts if p["category"] == "lab")
+    library_count = sum(1 for p in posts if p["category"] == "library")
     print(f"\n✅ Build complete!")
     print(f"   {len(posts)} posts generated ({lab_count} lab, {library_count} library)")
+    print(f"   Targets built: {', '.join(built) or 'none'}")
     print(f"   Blog archive: /blog/")
     print(f"   Lab index: /lab/")
-    print(f"   RSS feed: /feed.xml")
+    print(f"   Feeds: /feed.xml, /atom.xml, /feed.json")
+    written = write_stats["written"] - stats_before["written"]
+    unchanged = write_stats["unchanged"] - stats_before["unchanged"]
+    print(f"   {written} files written, {unchanged} already up to date")
+    if args.minify:
+        minified_bytes = sum(graph.value(name) or 0 for name in ("pages", "archives", "search") if name in built)
+        print(f"   Minifying saved {minified_bytes / 1024:.1f} KiB across generated pages")
+    
+    profiler.report(args.profile_top)
+    if args.trace:
+        profiler.write_trace(args.trace)
+
+
+def rebuild_changed(args):
+    """Rebuild after source files change; the target graph works out what they affect."""
+    with build_lock():
+        build(args)
+
+
+def watch(args):
+    """Build once, then rebuild on every source change while serving the site."""
+    import build_serve
+    
+    try:
+        with build_lock():
+            build(args)
+    except FrontmatterError as e:
+        # Keep watching: fixing the post triggers a rebuild like any other change
+        print(f"❌ {e}")
+    args.force = False
+    build_serve.watch(
+        lambda changed: rebuild_changed(args),
+        sources=[POSTS_DIR, READING_PATH],
+        code_paths=build_code_paths(),
+        port=args.port,
+    )
+
+
+def main(argv=None):
+    """Run the requested command; commands other than build and watch go to their own module."""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in COMMANDS:
+        return run_command(argv)
+    
+    args = parse_args(argv)
+    if args.command == "watch":
+        watch(args)
+        return
+    try:
+        if args.cprofile:
+            import cProfile
+            
+            profile = cProfile.Profile()
+            with build_lock():
+                profile.runcall(build, args)
+            profile.dump_stats(args.cprofile)
+            print(f"✓ Wrote cProfile stats to {args.cprofile} (view with: python -m pstats {args.cprofile})")
+        else:
+            with build_lock():
+                build(args)
+    except FrontmatterError as e:
+        raise SystemExit(f"❌ {e}")
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
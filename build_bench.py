@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Thunderclaw blog generator.
+Builds deterministic synthetic corpora, times each build stage at several
+corpus sizes, and saves the results per commit so regressions in build
+time or peak memory show up before they ship.
+
+Usage: python build.py bench [--sizes 100 1000 10000] [--compare REF]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from datetime import date, timedelta
+from pathlib import Path
+
+import build
+import post_index
+
+BENCH_DIR = Path(".bench")
+DEFAULT_SIZES = [100, 1000, 10000]
+REGRESSION_THRESHOLD = 0.10  # flag stages more than 10% slower or larger than the baseline
+# CLI invocations timed as fresh processes, so import time counts
+STARTUP_COMMANDS = {
+    "startup (--help)": ["--help"],
+    "startup (sitemap)": ["sitemap"],
+}
+
+# Files the build expects next to posts/
+SITE_FILES = ["index.html", "reading.json"]
+
+WORDS = """
+agent model prompt token context window retrieval vector embedding index
+latency throughput cache evaluation dataset pipeline inference training
+system design memory state tool call schema output parser chain graph
+engineer build ship test deploy monitor trace metric cost budget quality
+the a of to and in is that for it with as on this be are by from or
+""".split()
+
+# Line templates for synthetic code blocks; each block fills them from the
+# seeded rng, so blocks differ (and miss the highlight cache) like real posts
+CODE_LINES = {
+    "python": [
+        "{name} = {other}.{verb}({word}={number})",
+        "if {name} > {number}:\n    return {other}",
+        "for {name} in {other}:\n    {other}_{word}.append({name} * {number})",
+        "def {verb}_{name}({other}, {word}=None):\n    return {other}[\"{word}\"]",
+        "log.info(\"{word} %s\", {name})  # {word}",
+    ],
+    "bash": [
+        "{verb} --{word} {number} {name}.txt",
+        "export {upper}={number}",
+        "cat {name}.log | grep {word} | wc -l",
+        "python {name}.py --{word} \"{other}\"",
+    ],
+    "json": [
+        "\"{name}\": {number},",
+        "\"{name}\": \"{word} {other}\",",
+        "\"{name}\": [{number}, {number}],",
+    ],
+    "": [
+        "{name} -> {verb} -> {other}",
+        "{word}: {number} {other}",
+    ],
+}
+
+
+def synthetic_code(rng):
+    """Return (language, source) of a code block of 3-15 randomly filled lines."""
+    lang = rng.choice(list(CODE_LINES))
+    lines = []
+    for _ in range(rng.randint(3, 15)):
+        name, other, word, verb = (rng.choice(WORDS) for _ in range(4))
+        lines.append(rng.choice(CODE_LINES[lang]).format(
+            name=name, other=other, word=word, verb=verb, upper=name.upper(), number=rng.randint(0, 9999)))
+    if lang == "json":
+        return lang, "{\n" + "\n".join("  " + line for line in lines).rstrip(",") + "\n}"
+    return lang, "\n".join(lines)
+
+
+def synthetic_post(rng, number, body_words, code_density, callout_density):
+    """Return the markdown source of one synthetic post."""
+    def sentence(n):
+        words = [rng.choice(WORDS) for _ in range(n)]
+        return " ".join(words).capitalize() + "."
+
+    title = " ".join(rng.choice(WORDS) for _ in range(4)).title()
+    published = date(2020, 1, 1) + timedelta(days=number // 3)
+    category = "lab" if number % 10 == 0 else "library"
+    tags = ", ".join(sorted({rng.choice(WORDS) for _ in range(3)}))
+
+    sections = []
+    written = 0
+    while written < body_words:
+        paragraph = " ".join(sentence(rng.randint(8, 20)) for _ in range(rng.randint(2, 5)))
+        written += len(paragraph.split())
+        block = [f"## {sentence(4)[:-1]}", "", paragraph]
+        if rng.random() < code_density:
+            lang, code = synthetic_code(rng)
+            block += ["", f"```{lang}", code, "```"]
+        if rng.random() < callout_density:
+            block += ["", "::: callout", f"**{rng.choice(WORDS).title()}**", "", sentence(12), ":::"]
+        if rng.random() < 0.3:
+            block += [""] + [f"- **{rng.choice(WORDS)}**: {sentence(6)}" for _ in range(3)]
+        sections.append("\n".join(block))
+
+    return f"""---
+title: "{title} {number}"
+date: {published.isoformat()}
+description: "{sentence(10)}"
+category: {category}
+tags: [{tags}]
+---
+
+# {title} {number}
+
+""" + "\n\n".join(sections) + "\n"
+
+
+def generate_corpus(directory, count, body_words=800, code_density=0.2, callout_density=0.1, seed=1):
+    """Write count synthetic posts to directory/posts; same arguments give the same files."""
+    rng = random.Random(seed)
+    posts_dir = Path(directory) / "posts"
+    posts_dir.mkdir(parents=True, exist_ok=True)
+    for number in range(1, count + 1):
+        source = synthetic_post(rng, number, body_words, code_density, callout_density)
+        (posts_dir / f"{number:05d}-synthetic.md").write_text(source, encoding="utf-8")
+
+
+@contextmanager
+def site_directory(corpus_dir):
+    """Run the enclosed block from a fresh copy of the corpus with the site files next to it."""
+    repo = Path.cwd()
+    with tempfile.TemporaryDirectory(prefix="thunderclaw-bench-") as tmp:
+        shutil.copytree(Path(corpus_dir) / "posts", Path(tmp) / "posts")
+        for name in SITE_FILES:
+            if (repo / name).exists():
+                shutil.copy(repo / name, Path(tmp) / name)
+        os.chdir(tmp)
+        try:
+            yield Path(tmp)
+        finally:
+            os.chdir(repo)
+
+
+def measure(fn, setup=None, repeat=3):
+    """Time fn over repeat runs and measure its peak memory in one extra traced run.
+
+    setup() runs before every call, outside the timed region, and its
+    return value is passed to fn.
+    """
+    timings = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            started = time.perf_counter()
+            fn(arg)
+            timings.append(time.perf_counter() - started)
+
+    arg = setup() if setup else None
+    tracemalloc.start()
+    try:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            fn(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "peak_bytes": peak,
+    }
+
+
+def run_cli(args):
+    """Run build.py with args in a new interpreter, failing loudly if it fails."""
+    subprocess.run([sys.executable, str(Path(build.__file__).resolve()), *args],
+                   stdout=subprocess.DEVNULL, check=True)
+
+
+def bench_size(count, repeat, jobs, **corpus_options):
+    """Benchmark every stage on a synthetic corpus of count posts."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="thunderclaw-corpus-") as corpus_dir:
+        generate_corpus(corpus_dir, count, **corpus_options)
+        with site_directory(corpus_dir) as site:
+            sources = [p.read_text(encoding="utf-8") for p in sorted(Path("posts").glob("*.md"))]
+            index_path = site / post_index.INDEX_PATH
+
+            def clear_index():
+                index_path.unlink(missing_ok=True)
+
+            results["parse_frontmatter"] = measure(
+                lambda _: [post_index.parse_frontmatter(s) for s in sources], repeat=repeat)
+            results["load_posts (cold)"] = measure(
+                lambda _: build.load_posts(), setup=clear_index, repeat=repeat)
+            results["load_posts (warm)"] = measure(
+                lambda _: build.load_posts(), repeat=repeat)
+
+            posts = build.load_posts()
+            bodies = [p["body"] for p in posts]
+            results["markdown_to_html"] = measure(
+                lambda _: [build.markdown_to_html(b) for b in bodies], repeat=repeat)
+            results["generate_feeds"] = measure(
+                lambda _: build.generate_feeds(posts, build.FEED_SITE), repeat=repeat)
+
+            def clean_site():
+                shutil.rmtree(site / build.BUILD_CACHE_DIR, ignore_errors=True)
+                return build.parse_args(["--force", "--no-cache", "--jobs", str(jobs)])
+
+            results["build (full)"] = measure(build.build, setup=clean_site, repeat=repeat)
+            results["build (no-op)"] = measure(
+                build.build, setup=lambda: build.parse_args(["--jobs", str(jobs)]), repeat=repeat)
+            for stage, args in STARTUP_COMMANDS.items():
+                results[stage] = measure(lambda _: run_cli(args), repeat=repeat)
+    return results
+
+
+def git_revision():
+    """Return the current commit (with -dirty for uncommitted changes), or 'unknown'."""
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{revision}-dirty" if dirty else revision
+
+
+def load_results(ref):
+    """Load saved results by file path or by commit name under .bench/."""
+    path = Path(ref)
+    if not path.exists():
+        path = BENCH_DIR / f"{ref}.json"
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(current, baseline):
+    """Print per-stage changes against a baseline run; return the number of regressions."""
+    regressions = 0
+    print(f"\n📊 Compared with {baseline['revision']}")
+    for size, stages in current["results"].items():
+        base_stages = baseline["results"].get(size)
+        if not base_stages:
+            continue
+        for stage, result in stages.items():
+            base = base_stages.get(stage)
+            if not base:
+                continue
+            time_change = result["min_s"] / base["min_s"] - 1 if base["min_s"] else 0
+            memory_change = result["peak_bytes"] / base["peak_bytes"] - 1 if base["peak_bytes"] else 0
+            flag = ""
+            if time_change > REGRESSION_THRESHOLD or memory_change > REGRESSION_THRESHOLD:
+                flag = "  ⚠ regression"
+                regressions += 1
+            print(f"   {size:>6} {stage:<22} time {time_change:+7.1%}   peak {memory_change:+7.1%}{flag}")
+    return regressions
+
+
+def print_results(results):
+    print(f"\n   {'posts':>6} {'stage':<22} {'min ms':>10} {'median ms':>10} {'peak MiB':>9}")
+    for size, stages in results.items():
+        for stage, r in stages.items():
+            print(f"   {size:>6} {stage:<22} {r['min_s'] * 1000:>10.1f} {r['median_s'] * 1000:>10.1f} "
+                  f"{r['peak_bytes'] / 2**20:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Thunderclaw blog build on synthetic corpora.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="corpus sizes in posts")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (default: 3)")
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes for full builds")
+    parser.add_argument("--body-words", type=int, default=800, help="approximate words per post body")
+    parser.add_argument("--code-density", type=float, default=0.2, help="chance of a code block per section")
+    parser.add_argument("--callout-density", type=float, default=0.1, help="chance of a callout per section")
+    parser.add_argument("--seed", type=int, default=1, help="corpus generator seed")
+    parser.add_argument("--compare", metavar="REF", help="baseline results file or commit to compare against")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help=f"exit non-zero if a stage is more than {REGRESSION_THRESHOLD * 100:.0f}%% worse than the baseline")
+    args = parser.parse_args(argv)
+
+    # Load the baseline first; a rerun on the same commit overwrites its file
+    baseline = load_results(args.compare) if args.compare else None
+    corpus = {
+        "body_words": args.body_words,
+        "code_density": args.code_density,
+        "callout_density": args.callout_density,
+        "seed": args.seed,
+    }
+    print(f"⏱ Benchmarking build stages at {', '.join(map(str, args.sizes))} posts...")
+    results = {}
+    for size in args.sizes:
+        print(f"  → {size} posts")
+        results[str(size)] = bench_size(size, args.repeat, args.jobs, **corpus)
+
+    revision = git_revision()
+    report = {
+        "revision": revision,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "corpus": corpus,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    print_results(results)
+
+    BENCH_DIR.mkdir(exist_ok=True)
+    out_path = BENCH_DIR / f"{revision}.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Saved results to {out_path}")
+
+    if baseline:
+        regressions = compare(report, baseline)
+        if regressions and args.fail_on_regression:
+            print(f"❌ {regressions} regressions over {REGRESSION_THRESHOLD:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
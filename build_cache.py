@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+On-disk caches for the Thunderclaw blog build.
+Stores expensive render results under .build-cache/ so unchanged inputs
+are never rendered twice, even across --force rebuilds.
+"""
+
+import os
+import hashlib
+from pathlib import Path
+
+# Build state (not deployed, safe to delete)
+BUILD_CACHE_DIR = Path(".build-cache")
+
+
+class RenderCache:
+    """Content-addressed cache of rendered HTML with size-bounded LRU eviction.
+
+    Entries are keyed by the SHA-256 of a namespace string (renderer versions
+    and settings) plus the source text, and stored as one file per entry.
+    A hit bumps the entry's mtime, which is what eviction orders by.
+    The object only holds paths and settings, so it can be shipped to
+    worker processes.
+    """
+
+    def __init__(self, directory, namespace, max_bytes):
+        self.directory = Path(directory)
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+
+    def key(self, source):
+        """Return the cache key for a source text."""
+        digest = hashlib.sha256()
+        digest.update(self.namespace.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(source.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.html"
+
+    def get(self, source):
+        """Return cached HTML for source, or None on a miss."""
+        path = self._path(self.key(source))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                html = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return html
+
+    def put(self, source, html):
+        """Store rendered HTML for source."""
+        path = self._path(self.key(source))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique temp name so concurrent workers never clobber each other
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes.
+
+        Returns the number of entries removed.
+        """
+        if not self.directory.exists():
+            return 0
+        entries = []
+        total = 0
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Precompressed .gz and .br siblings for Thunderclaw build outputs.
+Static hosts that support it serve these directly, so text outputs are
+compressed once at the highest level instead of on every request. A
+sibling carries its source's mtime; a source whose mtime still matches
+is skipped. write_output() only changes mtimes when content changes, and
+removes a file's siblings when it does; stale outputs are deleted with
+build_io.remove_output(), which takes their siblings too. So a build
+without --compress never leaves stale or orphaned copies behind.
+"""
+
+import os
+import gzip
+from pathlib import Path
+from build_io import SIBLING_SUFFIXES
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_EXTENSIONS = {".html", ".xml", ".css", ".js", ".json"}
+# Below this the compressed copy saves less than the extra request headers cost
+COMPRESS_MIN_BYTES = 512
+
+
+def _compressors():
+    """Return (suffix, compress) pairs for the available encodings."""
+    pairs = [(".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli:
+        pairs.append((".br", lambda data: brotli.compress(data, quality=11)))
+    return pairs
+
+
+def _sibling(path, suffix):
+    return path.with_name(path.name + suffix)
+
+
+def is_current(path, stat=None):
+    """True if every sibling of path exists and matches its mtime."""
+    stat = stat or path.stat()
+    for suffix, _ in _compressors():
+        try:
+            if _sibling(path, suffix).stat().st_mtime_ns != stat.st_mtime_ns:
+                return False
+        except FileNotFoundError:
+            return False
+    return True
+
+
+def compress_file(path):
+    """Write path's compressed siblings; returns (original bytes, {suffix: bytes})."""
+    path = Path(path)
+    stat = path.stat()
+    with open(path, "rb") as f:
+        data = f.read()
+    sizes = {}
+    for suffix, compress in _compressors():
+        sibling = _sibling(path, suffix)
+        compressed = compress(data)
+        tmp_path = sibling.with_name(f".{sibling.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(compressed)
+            os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            os.replace(tmp_path, sibling)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        sizes[suffix] = len(compressed)
+    return len(data), sizes
+
+
+def candidate_files(paths):
+    """Yield the compressible files among paths, descending into directories.
+
+    Siblings whose source is gone or has become too small are removed on the way.
+    """
+    for root in map(Path, paths):
+        if root.is_dir():
+            files = sorted(p for p in root.rglob("*") if p.is_file())
+        elif root.exists():
+            files = [root, *(_sibling(root, s) for s in SIBLING_SUFFIXES if _sibling(root, s).exists())]
+        else:
+            files = [_sibling(root, s) for s in SIBLING_SUFFIXES if _sibling(root, s).exists()]
+        for path in files:
+            if path.suffix in SIBLING_SUFFIXES:
+                source = path.with_suffix("")
+                if source.suffix in COMPRESS_EXTENSIONS and (
+                        not source.exists() or source.stat().st_size < COMPRESS_MIN_BYTES):
+                    path.unlink()
+            elif path.suffix in COMPRESS_EXTENSIONS and path.stat().st_size >= COMPRESS_MIN_BYTES:
+                yield path
+
+
+def compress_outputs(paths, workers=1):
+    """Compress every changed output under paths, spread over worker processes."""
+    if brotli is None:
+        print("⚠ brotli not installed, skipping .br files")
+
+    candidates = list(candidate_files(paths))
+    pending = [p for p in candidates if not is_current(p)]
+    if workers > 1 and len(pending) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        workers = min(workers, len(pending))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(compress_file, pending, chunksize=max(1, len(pending) // (workers * 4))))
+    else:
+        results = [compress_file(p) for p in pending]
+
+    original = sum(size for size, _ in results)
+    summary = ", ".join(
+        f"{suffix[1:]} {original / 1024:.0f} → {sum(s[suffix] for _, s in results) / 1024:.0f} KiB"
+        for suffix, _ in _compressors()
+    )
+    print(f"✓ Compressed {len(pending)} outputs ({len(candidates) - len(pending)} up to date)"
+          + (f" — {summary}" if results else ""))
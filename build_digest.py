@@ -1,15 +1,18 @@
 #!/usr/bin/env python3
 """
 Weekly digest generator for Thunderclaw blog.
-Creates a digest post summarizing all posts from the past week.
+Creates a digest post summarizing all posts from the past week, or one
+per date range (--range, --backfill) from a single metadata load, then
+rebuilds the site incrementally in the same process.
 """
 
-import os
 import sys
-import subprocess
+import argparse
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
 from pathlib import Path
-from build import parse_frontmatter, load_posts
+from build_io import build_lock, write_output
+from post_index import load_posts
 
 # Configuration
 POSTS_DIR = Path("posts")
@@ -74,14 +77,14 @@ That's the week. More to come.
 
 
 def get_topics(posts):
-    """Extract unique topics/tags from posts."""
+    """Extract unique topics/tags from posts, sorted so digests are reproducible."""
     topics = set()
     for post in posts:
         if isinstance(post.get('tags'), list):
             topics.update(post['tags'])
     
     # Filter out 'digest' and 'meta' from the list
-    topics = [t for t in topics if t not in ['digest', 'meta']]
+    topics = sorted(t for t in topics if t not in ['digest', 'meta'])
     
     if not topics:
         return ["various topics"]
@@ -93,70 +96,141 @@ def get_topics(posts):
         return [", ".join(topics[:-1]) + f", and {topics[-1]}"]
 
 
-def main(days=None):
-    """Generate weekly digest."""
-    if days is None:
-        days = DIGEST_DAYS
-    
-    print(f"📊 Generating digest for the past {days} days...")
-    
-    # Calculate date range
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    
-    # Load all posts
-    all_posts = load_posts()
-    
-    # Filter posts within date range
-    digest_posts = []
-    for post in all_posts:
+def existing_digests():
+    """Map end dates of digests already in posts/ to their paths."""
+    digests = {}
+    for path in POSTS_DIR.glob("*-weekly-digest-*.md"):
+        digests[path.stem.rsplit("-weekly-digest-", 1)[1]] = path
+    return digests
+
+
+def posts_in_range(posts, dates, start_date, end_date):
+    """Return posts dated within [start_date, end_date], oldest first.
+
+    posts must be sorted by date with dates their parsed dates, so each
+    range is two binary searches instead of a scan of the archive.
+    """
+    return posts[bisect_left(dates, start_date):bisect_right(dates, end_date)]
+
+
+def weekly_ranges(first, last):
+    """Return (monday, sunday) for every complete week from first to last."""
+    monday = datetime.combine(first.date() - timedelta(days=first.weekday()), datetime.min.time())
+    ranges = []
+    while monday + timedelta(days=6) <= last:
+        ranges.append((monday, monday + timedelta(days=6)))
+        monday += timedelta(days=7)
+    return ranges
+
+
+def parse_range(value):
+    """Parse START:END (YYYY-MM-DD, inclusive) into a pair of datetimes."""
+    try:
+        start, end = (datetime.strptime(d, "%Y-%m-%d") for d in value.split(":"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected START:END as YYYY-MM-DD:YYYY-MM-DD, got {value!r}")
+    if end < start:
+        raise argparse.ArgumentTypeError(f"range ends before it starts: {value}")
+    return start, end
+
+
+def write_digests(ranges, posts):
+    """Write one digest per (start, end) range; returns (written, unchanged) counts.
+
+    posts come from a single metadata load. Digests already in posts/ are
+    never digested themselves, and a range whose digest exists is rewritten
+    in place instead of getting a new post number. Digests whose content
+    is already current are left untouched.
+    """
+    posts = sorted(
+        (p for p in posts if "digest" not in (p["tags"] if isinstance(p["tags"], list) else [p["tags"]])),
+        key=lambda p: p["date"],
+    )
+    dates = []
+    dated_posts = []
+    for post in posts:
         try:
-            post_date = datetime.strptime(post['date'], '%Y-%m-%d')
-            if start_date <= post_date <= end_date:
-                digest_posts.append(post)
-        except (ValueError, KeyError):
+            dates.append(datetime.strptime(post["date"], "%Y-%m-%d"))
+            dated_posts.append(post)
+        except ValueError:
             continue
     
-    # Sort by date (oldest first for digest)
-    digest_posts.sort(key=lambda p: p['date'])
-    
-    if not digest_posts:
-        print(f"❌ No posts found in the past {days} days.")
-        return 1
-    
-    # Generate digest content
-    content = generate_digest(digest_posts, start_date, end_date)
-    
-    if not content:
-        return 1
-    
-    # Get next post number
+    digests = existing_digests()
     post_num = get_next_post_number()
-    
-    # Create filename
-    filename = f"{post_num:03d}-weekly-digest-{end_date.strftime('%Y-%m-%d')}.md"
-    output_path = POSTS_DIR / filename
-    
-    # Write digest post
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(content)
-    
-    print(f"✓ Created digest post: {filename}")
-    print(f"  {len(digest_posts)} posts included")
-    
-    # Run build.py to regenerate site
-    print("\n🔨 Running build.py...")
-    result = subprocess.run([sys.executable, 'build.py'], cwd=Path(__file__).parent)
-    
-    if result.returncode != 0:
-        print("❌ Build failed!")
-        return 1
-    
-    print("\n✅ Digest generated and site rebuilt!")
+    written = unchanged = 0
+    for start_date, end_date in ranges:
+        digest_posts = posts_in_range(dated_posts, dates, start_date, end_date)
+        if not digest_posts:
+            print(f"  – {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}: no posts, skipped")
+            continue
+        
+        content = generate_digest(digest_posts, start_date, end_date)
+        end_str = end_date.strftime('%Y-%m-%d')
+        output_path = digests.get(end_str)
+        if output_path is None:
+            output_path = POSTS_DIR / f"{post_num:03d}-weekly-digest-{end_str}.md"
+            post_num += 1
+        
+        if not write_output(output_path, content):
+            print(f"  – {output_path.name}: unchanged")
+            unchanged += 1
+            continue
+        written += 1
+        print(f"✓ Created digest post: {output_path.name}")
+        print(f"  {len(digest_posts)} posts included")
+    return written, unchanged
+
+
+def main(argv=None):
+    """Generate digests, then rebuild the site once."""
+    parser = argparse.ArgumentParser(description="Generate digest posts for the Thunderclaw blog.")
+    parser.add_argument("days", nargs="?", type=int, default=DIGEST_DAYS,
+                        help=f"digest the past DAYS days (default: {DIGEST_DAYS})")
+    parser.add_argument("--range", dest="ranges", action="append", type=parse_range, metavar="START:END",
+                        help="digest posts between two dates, inclusive; repeatable")
+    parser.add_argument("--backfill", action="store_true",
+                        help="write a digest for every complete Monday-Sunday week of the archive")
+    parser.add_argument("--no-build", action="store_true", help="don't rebuild the site afterwards")
+    args = parser.parse_args(argv)
+    
+    with build_lock():
+        # One metadata load serves every range; bodies are never read
+        all_posts = load_posts()
+        
+        if args.backfill:
+            dates = [datetime.strptime(p["date"], "%Y-%m-%d") for p in all_posts if p["date"]]
+            if not dates:
+                print("❌ No posts to backfill.")
+                return 1
+            ranges = weekly_ranges(min(dates), datetime.now())
+            print(f"📊 Backfilling {len(ranges)} weekly digests...")
+        elif args.ranges:
+            ranges = args.ranges
+            print(f"📊 Generating {len(ranges)} digests...")
+        else:
+            print(f"📊 Generating digest for the past {args.days} days...")
+            end_date = datetime.now()
+            ranges = [(end_date - timedelta(days=args.days), end_date)]
+        
+        written, unchanged = write_digests(ranges, all_posts)
+        if not written and not unchanged:
+            print("❌ No posts found in the specified date ranges.")
+            return 1
+        if not written:
+            print(f"\n✅ {unchanged} digest{'s' if unchanged > 1 else ''} already up to date, nothing to rebuild")
+            return 0
+        
+        if args.no_build:
+            return 0
+        
+        # Rebuild in this process; only the new digests and their neighbors re-render
+        print("\n🔨 Rebuilding site...")
+        import build
+        build.build(build.parse_args([]))
+    
+    print(f"\n✅ {written} digest{'s' if written > 1 else ''} generated and site rebuilt!")
     return 0
 
 
 if __name__ == "__main__":
-    # Allow custom days as argument
-    days = int(sys.argv[1]) if len(sys.argv) > 1 else DIGEST_DAYS
-    sys.exit(main(days))
+    sys.exit(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+RSS, Atom and JSON Feed output for the Thunderclaw blog.
+The subscription feeds carry only the newest posts; older posts live in
+fixed-size archive pages linked RFC 5005 style (prev-archive/next-archive),
+so what pollers download stays the same size as the archive grows.
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from build_io import open_output, remove_output, write_output
+
+FEED_ITEM_LIMIT = 20
+FEED_ARCHIVE_DIR = Path("feeds")
+FEED_AUTHOR = "Thunderclaw"
+
+# Subscription feed paths and the archive page name pattern for each format
+FEED_FORMATS = {
+    "rss": ("feed.xml", "rss-{page}.xml"),
+    "atom": ("atom.xml", "atom-{page}.xml"),
+    "json": ("feed.json", "json-{page}.json"),
+}
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+HISTORY_NS = "http://purl.org/syndication/history/1.0"
+JSON_FEED_VERSION = "https://jsonfeed.org/version/1.1"
+
+
+def format_rfc822(date_str):
+    """Format date for RSS feed (RFC 822)."""
+    date = datetime.strptime(date_str, "%Y-%m-%d")
+    # Set time to 6:00 AM UTC
+    date = date.replace(hour=6, minute=0, second=0)
+    return date.strftime("%a, %d %b %Y %H:%M:%S +0000")
+
+
+def format_rfc3339(date_str):
+    """Format date for Atom and JSON Feed (RFC 3339), at the same 6:00 AM UTC."""
+    return f"{date_str}T06:00:00Z"
+
+
+def feed_item(post, site_url, content_html=None):
+    """Return the format-neutral item all three feed formats are written from."""
+    tags = post["tags"] if isinstance(post["tags"], list) else [post["tags"]]
+    url = f"{site_url}/blog/{post['filename']}"
+    return {
+        "id": url,
+        "url": url,
+        "title": post["title"],
+        "date": post["date"],
+        "summary": post["description"],
+        "category": post["category"],
+        "tags": [t for t in tags if t],
+        "content_html": content_html,
+    }
+
+
+class XMLWriter:
+    """Streams indented XML to a text file; all text and attributes are escaped."""
+
+    def __init__(self, out):
+        from xml.sax.saxutils import XMLGenerator  # pulls in urllib; only feeds need it
+        self.gen = XMLGenerator(out, encoding="utf-8", short_empty_elements=True)
+        self.depth = 0
+        self.gen.startDocument()
+
+    def _indent(self):
+        if self.depth:  # startDocument() already ended the line before the root
+            self.gen.ignorableWhitespace("\n" + "  " * self.depth)
+
+    def start(self, name, attrs=None):
+        self._indent()
+        self.gen.startElement(name, attrs or {})
+        self.depth += 1
+
+    def end(self, name):
+        self.depth -= 1
+        self.gen.ignorableWhitespace("\n" + "  " * self.depth)
+        self.gen.endElement(name)
+
+    def element(self, name, text=None, attrs=None):
+        self._indent()
+        self.gen.startElement(name, attrs or {})
+        if text is not None:
+            self.gen.characters(text)
+        self.gen.endElement(name)
+
+    def close(self):
+        self.gen.ignorableWhitespace("\n")
+        self.gen.endDocument()
+
+
+def write_rss(path, items, site, links, archive):
+    """Write an RSS 2.0 document; links maps rel -> URL."""
+    with open_output(path) as f:
+        xml = XMLWriter(f)
+        xml.start("rss", {"version": "2.0", "xmlns:atom": ATOM_NS,
+                          "xmlns:content": CONTENT_NS, "xmlns:fh": HISTORY_NS})
+        xml.start("channel")
+        xml.element("title", site["title"])
+        xml.element("link", site["url"])
+        xml.element("description", site["description"])
+        xml.element("language", "en-us")
+        if archive:
+            xml.element("fh:archive")
+        for rel, href in links.items():
+            xml.element("atom:link", attrs={"href": href, "rel": rel, "type": "application/rss+xml"})
+        for item in items:
+            xml.start("item")
+            xml.element("title", item["title"])
+            xml.element("link", item["url"])
+            xml.element("guid", item["id"])
+            xml.element("pubDate", format_rfc822(item["date"]))
+            xml.element("description", item["summary"])
+            if item["content_html"]:
+                xml.element("content:encoded", item["content_html"])
+            xml.element("category", item["category"])
+            xml.end("item")
+        xml.end("channel")
+        xml.end("rss")
+        xml.close()
+
+
+def write_atom(path, items, site, links, archive):
+    """Write an Atom 1.0 document; links maps rel -> URL."""
+    with open_output(path) as f:
+        xml = XMLWriter(f)
+        xml.start("feed", {"xmlns": ATOM_NS, "xmlns:fh": HISTORY_NS})
+        xml.element("id", links["self"])
+        xml.element("title", site["title"])
+        xml.element("subtitle", site["description"])
+        xml.element("updated", format_rfc3339(max((i["date"] for i in items), default="1970-01-01")))
+        xml.start("author")
+        xml.element("name", FEED_AUTHOR)
+        xml.end("author")
+        xml.element("link", attrs={"href": f"{site['url']}/", "rel": "alternate", "type": "text/html"})
+        if archive:
+            xml.element("fh:archive")
+        for rel, href in links.items():
+            xml.element("link", attrs={"href": href, "rel": rel, "type": "application/atom+xml"})
+        for item in items:
+            xml.start("entry")
+            xml.element("id", item["id"])
+            xml.element("title", item["title"])
+            xml.element("link", attrs={"href": item["url"], "rel": "alternate", "type": "text/html"})
+            xml.element("published", format_rfc3339(item["date"]))
+            xml.element("updated", format_rfc3339(item["date"]))
+            xml.element("summary", item["summary"])
+            if item["content_html"]:
+                xml.element("content", item["content_html"], {"type": "html"})
+            xml.element("category", attrs={"term": item["category"]})
+            xml.end("entry")
+        xml.end("feed")
+        xml.close()
+
+
+def write_json_feed(path, items, site, links, archive):
+    """Write a JSON Feed 1.1 document; next_url points at the next older page."""
+    feed = {
+        "version": JSON_FEED_VERSION,
+        "title": site["title"],
+        "home_page_url": f"{site['url']}/",
+        "feed_url": links["self"],
+        "description": site["description"],
+        "authors": [{"name": FEED_AUTHOR}],
+        "language": "en-US",
+    }
+    if "prev-archive" in links:
+        feed["next_url"] = links["prev-archive"]
+    feed["items"] = []
+    for item in items:
+        entry = {
+            "id": item["id"],
+            "url": item["url"],
+            "title": item["title"],
+            "summary": item["summary"],
+            "date_published": format_rfc3339(item["date"]),
+            "tags": item["tags"],
+        }
+        if item["content_html"]:
+            entry["content_html"] = item["content_html"]
+        else:
+            entry["content_text"] = item["summary"]
+        feed["items"].append(entry)
+    write_output(path, json.dumps(feed, ensure_ascii=False, indent=2) + "\n")
+
+
+WRITERS = {"rss": write_rss, "atom": write_atom, "json": write_json_feed}
+
+
+def generate_feeds(posts, site, limit=FEED_ITEM_LIMIT, content_html=None):
+    """Write the RSS, Atom and JSON feeds plus their archive pages.
+
+    posts are newest first; site has url, title and description. The
+    subscription feeds hold the newest `limit` posts (all of them when limit
+    is 0). Archive pages hold `limit` posts each, counted from the oldest
+    post, so a page never changes once full and only full pages are
+    published; the subscription feed always covers the posts after the last
+    full page. content_html(post), when given, supplies full post HTML for
+    subscription feed items; archive pages carry summaries only.
+    """
+    limit = limit or len(posts)
+    oldest_first = posts[::-1]
+    full_pages = len(posts) // limit if limit < len(posts) else 0
+
+    def archive_url(fmt, page):
+        return f"{site['url']}/{FEED_ARCHIVE_DIR.as_posix()}/{FEED_FORMATS[fmt][1].format(page=page)}"
+
+    latest = [feed_item(p, site["url"], content_html(p) if content_html else None) for p in posts[:limit]]
+    for fmt, (path, _) in FEED_FORMATS.items():
+        links = {"self": f"{site['url']}/{path}"}
+        if full_pages:
+            links["prev-archive"] = archive_url(fmt, full_pages)
+        WRITERS[fmt](Path(path), latest, site, links, archive=False)
+
+    keep = set()
+    if full_pages:
+        FEED_ARCHIVE_DIR.mkdir(exist_ok=True)
+    for page in range(1, full_pages + 1):
+        chunk = oldest_first[(page - 1) * limit:page * limit]
+        items = [feed_item(p, site["url"]) for p in reversed(chunk)]
+        for fmt, (path, pattern) in FEED_FORMATS.items():
+            links = {"self": archive_url(fmt, page), "current": f"{site['url']}/{path}"}
+            if page > 1:
+                links["prev-archive"] = archive_url(fmt, page - 1)
+            if page < full_pages:
+                links["next-archive"] = archive_url(fmt, page + 1)
+            archive_path = FEED_ARCHIVE_DIR / pattern.format(page=page)
+            WRITERS[fmt](archive_path, items, site, links, archive=True)
+            keep.add(archive_path.name)
+
+    if FEED_ARCHIVE_DIR.exists():
+        for stale in FEED_ARCHIVE_DIR.iterdir():
+            if stale.suffix in (".xml", ".json") and stale.name not in keep:
+                remove_output(stale)
+
+    print(f"✓ Generated feed.xml, atom.xml and feed.json with {len(latest)} posts "
+          f"({full_pages} archive pages)")
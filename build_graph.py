@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Build targets for the Thunderclaw blog.
+The build is a graph of named targets, each with declared inputs. A target
+only runs when the hash of its inputs differs from the last successful
+build (or its outputs are missing), so an edit only rebuilds what depends
+on it. Targets that don't depend on each other run concurrently.
+"""
+
+import sys
+import json
+import hashlib
+import threading
+from contextlib import nullcontext, redirect_stdout
+from build_cache import BUILD_CACHE_DIR
+from build_io import write_output
+
+GRAPH_STATE_PATH = BUILD_CACHE_DIR / "targets.json"
+
+
+class LineWriter:
+    """A stdout wrapper that keeps lines printed from different threads whole.
+
+    print() writes the text and the newline separately, so concurrent
+    targets could otherwise splice their progress lines together.
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.lock = threading.Lock()
+        self.pending = threading.local()
+
+    def write(self, text):
+        text = getattr(self.pending, "text", "") + text
+        complete, _, self.pending.text = text.rpartition("\n")
+        if complete:
+            with self.lock:
+                self.out.write(complete + "\n")
+        return len(text)
+
+    def flush(self):
+        with self.lock:
+            self.out.flush()
+
+
+class Target:
+    """One step of the build.
+
+    run(graph) does the work and returns a value other targets can ask for
+    with graph.value(name). inputs(graph) returns everything (JSON-able)
+    the target's output depends on; None means it has no declared inputs
+    and runs whenever it is selected. outputs(graph) lists files that must
+    exist for the target to count as built. Targets without outputs only
+    produce values and run when something needs them. after names targets
+    that must finish first, when they are selected too. rehash is for
+    targets whose inputs include a file they patch in place: their key is
+    taken again after they run, so their own write doesn't dirty them.
+    """
+
+    def __init__(self, name, run, inputs=None, outputs=None, after=(), rehash=False):
+        self.name = name
+        self.run = run
+        self.inputs = inputs
+        self.outputs = outputs
+        self.after = tuple(after)
+        self.rehash = rehash
+
+
+class BuildGraph:
+    """Runs the dirty targets of a build and remembers what each was built from.
+
+    version covers the build code itself; when it changes, every target is
+    dirty. With force, every selected target runs regardless of its inputs.
+    phase(name) is a context manager (BuildProfiler.phase) timing the input
+    hashing before each wave.
+    """
+
+    def __init__(self, targets, version, force=False, concurrent=True, phase=None):
+        self.targets = {t.name: t for t in targets}
+        self.version = version
+        self.force = force
+        self.concurrent = concurrent
+        self.phase = phase or (lambda name: nullcontext())
+        self._values = {}
+        self._locks = {name: threading.Lock() for name in self.targets}
+        self._state = self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(GRAPH_STATE_PATH, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return state.get("targets", {}) if state.get("version") == self.version else {}
+
+    def _save_state(self):
+        BUILD_CACHE_DIR.mkdir(exist_ok=True)
+        state = {"version": self.version, "targets": self._state}
+        write_output(GRAPH_STATE_PATH, json.dumps(state, indent=1, sort_keys=True))
+
+    def value(self, name):
+        """Return a target's value, running it first if it hasn't run in this build."""
+        with self._locks[name]:
+            if name not in self._values:
+                self._values[name] = self.targets[name].run(self)
+            return self._values[name]
+
+    def key(self, name):
+        """Hash a target's declared inputs; other targets' inputs may include it."""
+        inputs = self.targets[name].inputs(self)
+        payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_dirty(self, name, key):
+        """True if a target has to run: forced, no declared inputs, new inputs, or missing outputs."""
+        target = self.targets[name]
+        if self.force or key is None or self._state.get(name) != key:
+            return True
+        return not all(path.exists() for path in target.outputs(self))
+
+    def output_targets(self):
+        """Names of the targets that write files, in declaration order."""
+        return [name for name, t in self.targets.items() if t.outputs is not None]
+
+    def run(self, selected=None):
+        """Bring the selected targets (default: every output target) up to date.
+
+        Targets are taken in waves: a wave is every remaining target whose
+        `after` targets are done. Each target's inputs are hashed just before
+        its wave, so they reflect what earlier waves wrote. Returns
+        (built, skipped) target names.
+        """
+        pending = list(selected or self.output_targets())
+        built, skipped = [], []
+        while pending:
+            wave = [name for name in pending
+                    if not any(dep in pending for dep in self.targets[name].after)]
+            if not wave:
+                raise ValueError(f"build targets depend on each other: {', '.join(pending)}")
+            pending = [name for name in pending if name not in wave]
+
+            dirty = {}
+            with self.phase("target inputs"):
+                for name in wave:
+                    key = None if self.targets[name].inputs is None else self.key(name)
+                    if self.is_dirty(name, key):
+                        dirty[name] = key
+                    else:
+                        skipped.append(name)
+
+            try:
+                if self.concurrent and len(dirty) > 1:
+                    from concurrent.futures import ThreadPoolExecutor
+                    with redirect_stdout(LineWriter(sys.stdout)):
+                        with ThreadPoolExecutor(max_workers=len(dirty)) as pool:
+                            for name, future in [(n, pool.submit(self.value, n)) for n in dirty]:
+                                future.result()
+                                self._record(name, dirty[name], built)
+                else:
+                    for name in dirty:
+                        self.value(name)
+                        self._record(name, dirty[name], built)
+            finally:
+                self._save_state()
+        return built, skipped
+
+    def _record(self, name, key, built):
+        built.append(name)
+        if key is not None:
+            self._state[name] = self.key(name) if self.targets[name].rehash else key
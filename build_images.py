@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Responsive images for the Thunderclaw blog.
+Resizes the images posts reference (and their Open Graph images) into a
+few widths, in AVIF and WebP plus the original format, and rewrites
+post <img> tags into <picture> elements with srcset. Variants are cached
+by source hash, so an unchanged image is never encoded twice. Needs
+Pillow; without it posts keep their original images.
+"""
+
+import re
+import io
+import json
+import hashlib
+import posixpath
+from pathlib import Path
+from build_cache import BUILD_CACHE_DIR
+from build_io import remove_output, write_output
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+IMAGES_DIR = Path("assets") / "img"
+IMAGE_CACHE_PATH = BUILD_CACHE_DIR / "images.json"
+# Bump when encoding settings or variant naming change
+IMAGE_PIPELINE_VERSION = 1
+DEFAULT_OG_IMAGE = "/avatars/thunderclaw.jpg"
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+# Post column is 640px wide; the larger widths cover 1.5x and 2x screens
+IMAGE_WIDTHS = (320, 640, 960, 1280)
+IMAGE_SIZES = "(max-width: 640px) 100vw, 640px"
+OG_IMAGE_MAX_WIDTH = 1200
+QUALITY = {"avif": 50, "webp": 75, "jpeg": 82}
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+
+IMG_TAG_RE = re.compile(r"<img\b([^>]*?)\s*/?>")
+ATTR_RE = re.compile(r'(\w[\w-]*)="([^"]*)"')
+
+
+def modern_formats():
+    """Return the modern formats this Pillow can encode, best first."""
+    try:
+        import pillow_avif  # noqa: F401 - registers AVIF support on Pillow < 11.3
+    except ImportError:
+        pass
+    Image.init()  # load every format plugin so Image.SAVE is complete
+    return [fmt for fmt in ("avif", "webp") if fmt.upper() in Image.SAVE]
+
+
+def source_path(src, page_dir):
+    """Map an image src on a page in page_dir to a file, or None if it isn't local."""
+    if re.match(r"^[a-z][a-z0-9+.-]*:|^//", src, re.IGNORECASE):
+        return None
+    src = src.split("#", 1)[0].split("?", 1)[0]
+    if src.startswith("/"):
+        path = posixpath.normpath(src.lstrip("/"))
+    else:
+        path = posixpath.normpath(posixpath.join(page_dir.as_posix(), src))
+    if path.startswith("..") or Path(path).suffix.lower() not in IMAGE_EXTENSIONS:
+        return None
+    return Path(path)
+
+
+def load_cache(settings):
+    """Load cached sources and variants, or an empty cache if settings changed.
+
+    Without Pillow nothing can be re-encoded, so any cache is better than none.
+    """
+    try:
+        with open(IMAGE_CACHE_PATH, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {"sources": {}, "images": {}}
+    if Image is not None and cache.get("settings") != settings:
+        return {"sources": {}, "images": {}}
+    return cache
+
+
+def source_hash(path, sources):
+    """Hash an image file, reusing the cached hash while its mtime and size match."""
+    stat = path.stat()
+    cached = sources.get(path.as_posix())
+    if cached and cached[:2] == [stat.st_mtime_ns, stat.st_size]:
+        return cached[2]
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    sources[path.as_posix()] = [stat.st_mtime_ns, stat.st_size, digest]
+    return digest
+
+
+def encode_image(path, digest, formats):
+    """Write every variant of one image; returns its cache entry."""
+    with Image.open(path) as original:
+        image = ImageOps.exif_transpose(original)
+        width, height = image.size
+        has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+        fallback = "png" if has_alpha else "jpeg"
+        if not has_alpha:
+            image = image.convert("RGB")
+        elif image.mode != "RGBA":
+            image = image.convert("RGBA")
+
+        largest = min(width, max(IMAGE_WIDTHS))
+        widths = sorted({w for w in IMAGE_WIDTHS if w < largest} | {largest})
+        variants = {fmt: [] for fmt in [*formats, fallback]}
+        IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+        for w in widths:
+            resized = image if w == width else image.resize((w, round(height * w / width)), Image.Resampling.LANCZOS)
+            for fmt in variants:
+                buffer = io.BytesIO()
+                options = {"optimize": True} if fmt == "png" else {"quality": QUALITY[fmt]}
+                if fmt == "jpeg":
+                    options.update(optimize=True, progressive=True)
+                resized.save(buffer, format=fmt.upper(), **options)
+                ext = "jpg" if fmt == "jpeg" else fmt
+                filename = f"{path.stem}.{digest[:12]}-{w}.{ext}"
+                write_output(IMAGES_DIR / filename, buffer.getvalue())
+                variants[fmt].append([w, filename])
+
+    return {"width": width, "height": height, "fallback": fallback, "variants": variants}
+
+
+def image_info(entry):
+    """Turn a cache entry into the picture markup data passed to post rendering."""
+    def url(filename):
+        return f"/{IMAGES_DIR.as_posix()}/{filename}"
+
+    def srcset(fmt):
+        return ", ".join(f"{url(name)} {w}w" for w, name in entry["variants"][fmt])
+
+    fallback = entry["variants"][entry["fallback"]]
+    og_candidates = [name for w, name in fallback if w <= OG_IMAGE_MAX_WIDTH] or [fallback[0][1]]
+    return {
+        "width": entry["width"],
+        "height": entry["height"],
+        "sources": [[MIME_TYPES[fmt], srcset(fmt)] for fmt in entry["variants"] if fmt in MIME_TYPES],
+        "src": url(fallback[-1][1]),
+        "srcset": srcset(entry["fallback"]),
+        "og": url(og_candidates[-1]),
+    }
+
+
+def referenced_images(posts):
+    """Return every image src posts use, including Open Graph images and the default."""
+    srcs = {DEFAULT_OG_IMAGE}
+    for post in posts:
+        srcs.update(post["images"])
+        if post["image"]:
+            srcs.add(post["image"])
+    return srcs
+
+
+def pipeline_settings(formats):
+    """Return the encoding settings variants are cached under."""
+    return {
+        "version": IMAGE_PIPELINE_VERSION,
+        "widths": list(IMAGE_WIDTHS),
+        "quality": QUALITY,
+        "formats": formats,
+    }
+
+
+def image_inputs(posts, page_dir):
+    """Describe what process_images() output depends on, from file stats alone."""
+    sources = {}
+    for src in sorted(referenced_images(posts)):
+        path = source_path(src, page_dir)
+        if path is not None:
+            try:
+                stat = path.stat()
+                sources[src] = [stat.st_mtime_ns, stat.st_size]
+            except FileNotFoundError:
+                sources[src] = None
+    formats = modern_formats() if Image is not None else None
+    return {"settings": pipeline_settings(formats), "sources": sources}
+
+
+def process_images(posts, page_dir):
+    """Encode every image posts reference; returns {src: info} for image_info() data.
+
+    Relative srcs resolve against page_dir, where posts are published. Only
+    images whose source hash has no cached variants are encoded, and variant
+    files no referenced image uses are removed.
+    """
+    formats = modern_formats() if Image is not None else []
+    settings = pipeline_settings(formats)
+    if Image is None:
+        print("⚠ Pillow not installed, skipping image resizing")
+    cache = load_cache(settings)
+
+    srcs = referenced_images(posts)
+    images = {}
+    encoded = 0
+    used = set()
+    sources = {}
+    for src in sorted(srcs):
+        path = source_path(src, page_dir)
+        if path is None:
+            continue
+        if not path.exists():
+            print(f"⚠ Image not found: {src}")
+            continue
+        sources[path.as_posix()] = None
+        digest = source_hash(path, cache["sources"])
+        entry = cache["images"].get(digest)
+        if entry and not all((IMAGES_DIR / name).exists()
+                             for variants in entry["variants"].values() for _, name in variants):
+            entry = None
+        if entry is None:
+            if Image is None:
+                continue
+            entry = encode_image(path, digest, formats)
+            encoded += 1
+            cache["images"][digest] = entry
+        used.add(digest)
+        images[src] = image_info(entry)
+
+    # Drop cache entries and variant files no referenced image uses
+    cache["sources"] = {p: h for p, h in cache["sources"].items() if p in sources}
+    cache["images"] = {d: e for d, e in cache["images"].items() if d in used}
+    keep = {name for e in cache["images"].values() for variants in e["variants"].values() for _, name in variants}
+    if IMAGES_DIR.exists():
+        for stale in IMAGES_DIR.iterdir():
+            if stale.name not in keep:
+                remove_output(stale)
+
+    BUILD_CACHE_DIR.mkdir(exist_ok=True)
+    cache["settings"] = settings
+    write_output(IMAGE_CACHE_PATH, json.dumps(cache, indent=1, sort_keys=True))
+    print(f"✓ Processed {len(used)} images ({encoded} encoded, {len(used) - encoded} cached)")
+    return images
+
+
+def post_images(post, images):
+    """Select the image info a single post's page needs, including its OG image."""
+    selected = {src: images[src] for src in post["images"] if src in images}
+    og = post["image"] or DEFAULT_OG_IMAGE
+    if og in images:
+        selected[og] = images[og]
+    return selected
+
+
+def og_image_url(src, images, site_url, page_dir):
+    """Return the absolute URL to use as a page's Open Graph image."""
+    if src in images:
+        return site_url + images[src]["og"]
+    path = source_path(src, page_dir)
+    return f"{site_url}/{path.as_posix()}" if path else src
+
+
+def picture_html(attrs, info):
+    """Render a <picture> for an <img> tag's attributes."""
+    attrs = {k: v for k, v in attrs.items() if k not in ("src", "srcset", "sizes", "width", "height")}
+    attrs.setdefault("loading", "lazy")
+    attrs.setdefault("decoding", "async")
+    extra = "".join(f' {k}="{v}"' for k, v in attrs.items())
+    sources = "".join(
+        f'<source type="{mime}" srcset="{srcset}" sizes="{IMAGE_SIZES}">' for mime, srcset in info["sources"]
+    )
+    return (f'<picture>{sources}<img src="{info["src"]}" srcset="{info["srcset"]}" sizes="{IMAGE_SIZES}" '
+            f'width="{info["width"]}" height="{info["height"]}"{extra}></picture>')
+
+
+def responsive_images(html, images):
+    """Rewrite <img> tags whose src has processed variants into <picture> elements."""
+    if not images:
+        return html
+
+    def replace(match):
+        attrs = dict(ATTR_RE.findall(match.group(1)))
+        info = images.get(attrs.get("src"))
+        return picture_html(attrs, info) if info else match.group(0)
+
+    return IMG_TAG_RE.sub(replace, html)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Output helpers shared by the Thunderclaw build scripts.
+Every generated file goes through write_output(), which only touches the
+disk when content changes and replaces files atomically, dropping any
+precompressed .gz/.br copies the new content makes stale. build_lock()
+keeps concurrent builds from interleaving their writes.
+"""
+
+import os
+import time
+import filecmp
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from build_cache import BUILD_CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_PATH = BUILD_CACHE_DIR / "build.lock"
+# Precompressed copies written next to outputs (see build_compress)
+SIBLING_SUFFIXES = (".gz", ".br")
+
+# Files written vs. left alone because their content was already current, and
+# the wall/CPU seconds spent comparing and writing them (for the build profiler)
+write_stats = {"written": 0, "unchanged": 0, "seconds": 0.0, "cpu_seconds": 0.0}
+_write_stats_lock = threading.Lock()  # build targets can write from several threads
+
+
+def _count_write(kind, started, cpu_started):
+    with _write_stats_lock:
+        write_stats[kind] += 1
+        write_stats["seconds"] += time.perf_counter() - started
+        write_stats["cpu_seconds"] += time.process_time() - cpu_started
+
+
+def remove_siblings(path):
+    """Delete path's precompressed copies; hosts would otherwise serve them stale."""
+    for suffix in SIBLING_SUFFIXES:
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+
+def remove_output(path):
+    """Delete a stale output along with its precompressed copies."""
+    path = Path(path)
+    path.unlink(missing_ok=True)
+    remove_siblings(path)
+
+
+def write_output(path, content):
+    """Write text to path atomically, skipping the write if nothing changed.
+
+    Unchanged files keep their mtime, so sitemap dates and deploy tools see
+    only real changes. The new content is written to a temp file in the same
+    directory and renamed over the target, so readers never see a partial
+    file, and its .gz/.br copies are removed. Returns True if the file was
+    written.
+    """
+    started, cpu_started = time.perf_counter(), time.process_time()
+    path = Path(path)
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                _count_write("unchanged", started, cpu_started)
+                return False
+    except FileNotFoundError:
+        pass
+
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    remove_siblings(path)
+    _count_write("written", started, cpu_started)
+    return True
+
+
+@contextmanager
+def open_output(path, binary=False):
+    """Stream a generated file to disk with the same guarantees as write_output().
+
+    Yields a file object backed by a temp file; on a clean exit the temp
+    file replaces path, or is dropped if path already has identical content.
+    Only that final step counts as write time; streaming is the caller's.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        if binary:
+            with open(tmp_path, "wb") as f:
+                yield f
+        else:
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                yield f
+        started, cpu_started = time.perf_counter(), time.process_time()
+        if path.exists() and filecmp.cmp(tmp_path, path, shallow=False):
+            tmp_path.unlink()
+            _count_write("unchanged", started, cpu_started)
+        else:
+            os.replace(tmp_path, path)
+            remove_siblings(path)
+            _count_write("written", started, cpu_started)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _lock(fd, blocking):
+    if fcntl:
+        fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+    else:
+        msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+
+
+def _unlock(fd):
+    if fcntl:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+_lock_depth = 0
+
+
+@contextmanager
+def build_lock():
+    """Hold the build-wide lock, waiting for any other build to finish first.
+
+    Re-entrant within a process, so build steps that take the lock can be
+    called from a build that already holds it.
+    """
+    global _lock_depth
+    if _lock_depth:
+        _lock_depth += 1
+        try:
+            yield
+        finally:
+            _lock_depth -= 1
+        return
+
+    BUILD_CACHE_DIR.mkdir(exist_ok=True)
+    fd = os.open(LOCK_PATH, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            _lock(fd, blocking=False)
+        except OSError:
+            print("⏳ Waiting for another build to finish...")
+            started = time.monotonic()
+            while True:
+                try:
+                    _lock(fd, blocking=True)
+                    break
+                except OSError:
+                    # msvcrt gives up after ~10s; keep waiting like flock does
+                    time.sleep(0.1)
+            print(f"  → lock acquired after {time.monotonic() - started:.1f}s")
+        _lock_depth = 1
+        try:
+            yield
+        finally:
+            _lock_depth = 0
+            _unlock(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+HTML minification for the Thunderclaw build.
+Drops comments and template indentation from generated pages and
+tightens inline CSS and JS. Only whitespace that can't change rendering
+is removed: text keeps one space where it had any, attributes are left
+as written, and <pre>, <code> and <textarea> contents are never touched.
+"""
+
+import re
+
+# Bump when minify_html output changes, so minified posts get re-rendered
+MINIFY_VERSION = 1
+
+# Whitespace next to these tags never renders
+BLOCK_TAGS = frozenset("""
+!doctype html head body title meta link base style script noscript template
+div p ul ol li dl dt dd nav header footer main article section aside
+h1 h2 h3 h4 h5 h6 blockquote figure figcaption hr br pre form fieldset
+table thead tbody tfoot tr td th caption colgroup col details summary address
+""".split())
+
+_TAG = r"""<(?:[^>"']|"[^"]*"|'[^']*')*>"""
+TOKEN_RE = re.compile(
+    rf"(?P<raw><(?P<raw_name>pre|textarea|code|script|style)\b{_TAG[1:]}.*?</(?P=raw_name)\s*>)"
+    r"|(?P<comment><!--.*?-->)"
+    rf"|(?P<tag>{_TAG})",
+    re.DOTALL | re.IGNORECASE,
+)
+TAG_NAME_RE = re.compile(r"</?\s*(!?[\w-]+)")
+WHITESPACE_RE = re.compile(r"\s+")
+CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+CSS_PUNCTUATION_RE = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(css):
+    """Strip comments and insignificant whitespace from a stylesheet."""
+    css = CSS_COMMENT_RE.sub("", css)
+    css = WHITESPACE_RE.sub(" ", css)
+    css = CSS_PUNCTUATION_RE.sub(r"\1", css)
+    # Only after the colon: "a :hover" and "a:hover" are different selectors
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def minify_js(js):
+    """Drop indentation and blank lines; line breaks stay, so ASI behaves the same."""
+    if "`" in js:  # template literals may span lines, leave them exactly as written
+        return js
+    return "\n".join(line.strip() for line in js.splitlines() if line.strip())
+
+
+def _minify_raw(name, element):
+    """Minify inline <style>/<script> bodies; other raw elements stay verbatim."""
+    if name not in ("style", "script"):
+        return element
+    open_end = element.index(">") + 1
+    close_start = element.lower().rindex("</")
+    body = element[open_end:close_start]
+    body = minify_css(body) if name == "style" else minify_js(body)
+    return element[:open_end] + body + element[close_start:]
+
+
+def minify_html(html):
+    """Return html with comments and insignificant whitespace removed."""
+    tokens = []  # (text, is_block_tag, is_text)
+
+    def add_text(text):
+        text = WHITESPACE_RE.sub(" ", text)
+        if tokens and tokens[-1][2]:  # text on both sides of a dropped comment
+            text = WHITESPACE_RE.sub(" ", tokens.pop()[0] + text)
+        tokens.append((text, False, True))
+
+    position = 0
+    for match in TOKEN_RE.finditer(html):
+        if match.start() > position:
+            add_text(html[position:match.start()])
+        position = match.end()
+        if match.group("comment"):
+            if match.group("comment").startswith("<!--[if"):
+                tokens.append((match.group("comment"), False, False))
+            continue
+        if match.group("raw"):
+            name = match.group("raw_name").lower()
+            tokens.append((_minify_raw(name, match.group("raw")), name in BLOCK_TAGS, False))
+            continue
+        tag = match.group("tag")
+        name = TAG_NAME_RE.match(tag)
+        tokens.append((tag, bool(name) and name.group(1).lower() in BLOCK_TAGS, False))
+    if position < len(html):
+        add_text(html[position:])
+
+    out = []
+    for i, (text, _, is_text) in enumerate(tokens):
+        if is_text:
+            if i == 0 or tokens[i - 1][1]:
+                text = text.lstrip()
+            if i == len(tokens) - 1 or tokens[i + 1][1]:
+                text = text.rstrip()
+        out.append(text)
+    return "".join(out) + "\n"
+
+
+def bytes_saved(before, after):
+    """Return how many UTF-8 bytes minification removed."""
+    return len(before.encode("utf-8")) - len(after.encode("utf-8"))
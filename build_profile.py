@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Build profiling for the Thunderclaw blog.
+Times each build phase and each rendered post, and can write the result
+as a Chrome trace (chrome://tracing, Perfetto) for a closer look.
+"""
+
+import os
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from build_io import write_stats
+
+
+class BuildProfiler:
+    """Records wall time, CPU time and allocations per build phase and rendered post.
+
+    A disabled profiler keeps the same interface and costs next to nothing,
+    so the build can always call it. Allocation tracking uses tracemalloc,
+    which slows Python down, so it is only switched on while enabled.
+
+    Phases may nest; each reports only its own time, without its child
+    phases or the file writes (build_io) done inside it, which are reported
+    as one "write outputs" line. So the phases, the writes and whatever ran
+    outside any phase add up to the build's total.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.phases = []
+        self.posts = []
+        self.origin = time.time()
+        self.started = time.perf_counter()
+        self.total = None
+        self._writes_before = (write_stats["seconds"], write_stats["cpu_seconds"])
+        self._open = []  # per open phase: totals of its finished child phases
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as one named phase."""
+        if not self.enabled:
+            yield
+            return
+        nested = bool(self._open)
+        if not nested:  # resetting inside a phase would lose the outer phase's peak
+            tracemalloc.reset_peak()
+        children = {"wall": 0.0, "cpu": 0.0, "allocated": 0, "writes": 0.0, "write_cpu": 0.0}
+        self._open.append(children)
+        size_before, _ = tracemalloc.get_traced_memory()
+        writes_before = (write_stats["seconds"], write_stats["cpu_seconds"])
+        start = time.time()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            size_after, peak = tracemalloc.get_traced_memory()
+            writes = write_stats["seconds"] - writes_before[0]
+            write_cpu = write_stats["cpu_seconds"] - writes_before[1]
+            self._open.pop()
+            if self._open:
+                parent = self._open[-1]
+                parent["wall"] += elapsed - writes
+                parent["cpu"] += cpu - write_cpu
+                parent["allocated"] += size_after - size_before
+                parent["writes"] += writes
+                parent["write_cpu"] += write_cpu
+            self.phases.append({
+                "name": name,
+                "start": start,
+                "elapsed": elapsed,
+                "wall": elapsed - writes - children["wall"],
+                "cpu": cpu - write_cpu - children["cpu"],
+                "allocated": size_after - size_before - children["allocated"],
+                "peak": None if nested else peak - size_before,
+            })
+
+    def finish(self):
+        """Stop the build clock; report() calls this if the build hasn't."""
+        if self.total is None:
+            self.total = time.perf_counter() - self.started
+            self.write_time = write_stats["seconds"] - self._writes_before[0]
+            self.write_cpu = write_stats["cpu_seconds"] - self._writes_before[1]
+
+    def record_post(self, filename, timing):
+        """Record a post render; timing is (pid, start, seconds, cpu_seconds, allocated) from render_post."""
+        if self.enabled:
+            pid, start, seconds, cpu, allocated = timing
+            self.posts.append({"name": filename, "pid": pid, "start": start, "wall": seconds,
+                               "cpu": cpu, "allocated": allocated})
+
+    def report(self, slowest=10):
+        """Print per-phase times, file writes and the slowest posts.
+
+        Nested phases show no peak: the outer phase's peak covers them.
+        """
+        if not self.enabled:
+            return
+        self.finish()
+        print("\n⏱ Build profile")
+        print(f"   {'phase':<22} {'wall ms':>9} {'cpu ms':>9} {'alloc KiB':>10} {'peak KiB':>10}")
+        for p in self.phases:
+            peak = "–" if p["peak"] is None else f"{p['peak'] / 1024:.1f}"
+            print(f"   {p['name']:<22} {p['wall'] * 1000:>9.1f} {p['cpu'] * 1000:>9.1f} "
+                  f"{p['allocated'] / 1024:>10.1f} {peak:>10}")
+        print(f"   {'write outputs':<22} {self.write_time * 1000:>9.1f} {self.write_cpu * 1000:>9.1f}")
+        print(f"   {'outside phases':<22} {self.unattributed() * 1000:>9.1f}")
+        print(f"   {'total':<22} {self.total * 1000:>9.1f}")
+
+        if self.posts:
+            print(f"\n   Slowest {min(slowest, len(self.posts))} of {len(self.posts)} rendered posts:")
+            print(f"   {'wall ms':>9} {'cpu ms':>9} {'alloc KiB':>10}  post")
+            for p in sorted(self.posts, key=lambda p: p["wall"], reverse=True)[:slowest]:
+                allocated = "–" if p["allocated"] is None else f"{p['allocated'] / 1024:.1f}"
+                print(f"   {p['wall'] * 1000:>9.1f} {p['cpu'] * 1000:>9.1f} {allocated:>10}  {p['name']}")
+
+    def unattributed(self):
+        """Build time spent outside every phase and write; the report's rows add up to the total."""
+        self.finish()
+        return self.total - sum(p["wall"] for p in self.phases) - self.write_time
+
+    def write_trace(self, path):
+        """Write phases and post renders in Chrome trace event format."""
+        pid = os.getpid()
+        events = [
+            {"name": p["name"], "cat": "phase", "ph": "X", "pid": pid, "tid": 0,
+             "ts": (p["start"] - self.origin) * 1e6, "dur": p["elapsed"] * 1e6,
+             "args": {"self_ms": p["wall"] * 1000, "cpu_ms": p["cpu"] * 1000, "allocated": p["allocated"],
+                      "peak": p["peak"]}}
+            for p in self.phases
+        ]
+        events += [
+            {"name": p["name"], "cat": "post", "ph": "X", "pid": pid, "tid": p["pid"],
+             "ts": (p["start"] - self.origin) * 1e6, "dur": p["wall"] * 1e6,
+             "args": {"cpu_ms": p["cpu"] * 1000, "allocated": p["allocated"]}}
+            for p in self.posts
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        print(f"✓ Wrote build trace to {path}")
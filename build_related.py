@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Related posts for the Thunderclaw blog.
+Scores posts against each other with TF-IDF vectors and caches the vectors
+and each post's nearest neighbors, so a build that changes a few posts only
+rescores what those posts can affect. Needs NumPy; without it the build
+simply skips related posts.
+"""
+
+import math
+from collections import Counter
+from build_cache import BUILD_CACHE_DIR
+from build_search import terms_key
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+RELATED_CACHE_PATH = BUILD_CACHE_DIR / "related.npz"
+CACHE_VERSION = 1
+RELATED_COUNT = 3
+VOCABULARY_SIZE = 2048
+MAX_DOCUMENT_FREQUENCY = 0.5  # terms in more than half the posts say nothing about similarity
+MIN_SIMILARITY = 0.05
+REFIT_DRIFT = 0.1  # refit vocabulary and IDF once the post count moves by this fraction
+BLOCK_SIZE = 512  # rows per similarity block, bounds memory to BLOCK_SIZE x posts
+
+
+def fit_vocabulary(terms_by_post):
+    """Pick the most informative terms and their IDF weights."""
+    post_count = len(terms_by_post)
+    document_frequency = Counter()
+    for terms in terms_by_post.values():
+        document_frequency.update(terms.keys())
+
+    max_df = max(1, int(MAX_DOCUMENT_FREQUENCY * post_count))
+    candidates = [t for t, df in document_frequency.items() if 2 <= df <= max_df]
+    candidates.sort(key=lambda t: (-document_frequency[t], t))
+    vocabulary = candidates[:VOCABULARY_SIZE]
+    idf = np.array(
+        [math.log((1 + post_count) / (1 + document_frequency[t])) + 1 for t in vocabulary],
+        dtype=np.float32,
+    )
+    return vocabulary, idf
+
+
+def vectorize(terms, vocabulary_index, idf):
+    """Return a post's L2-normalized TF-IDF vector (sublinear term frequency)."""
+    vector = np.zeros(len(idf), dtype=np.float32)
+    for term, weight in terms.items():
+        i = vocabulary_index.get(term)
+        if i is not None:
+            vector[i] = (1 + math.log(weight)) * idf[i]
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def top_neighbors(similarities, k):
+    """Return (indices, scores) of the k best columns per row, best first.
+
+    Entries below MIN_SIMILARITY come back as index -1.
+    """
+    k = min(k, similarities.shape[1])
+    if k == 0:
+        shape = (similarities.shape[0], RELATED_COUNT)
+        return np.full(shape, -1, dtype=np.int32), np.zeros(shape, dtype=np.float32)
+    best = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    best_scores = np.take_along_axis(similarities, best, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    indices = np.take_along_axis(best, order, axis=1).astype(np.int32)
+    scores = np.take_along_axis(best_scores, order, axis=1).astype(np.float32)
+    indices[scores < MIN_SIMILARITY] = -1
+    if k < RELATED_COUNT:
+        pad = RELATED_COUNT - k
+        indices = np.pad(indices, ((0, 0), (0, pad)), constant_values=-1)
+        scores = np.pad(scores, ((0, 0), (0, pad)))
+    return indices, scores
+
+
+def score_rows(vectors, rows):
+    """Find nearest neighbors for the given rows, one matrix block at a time."""
+    indices = np.full((len(rows), RELATED_COUNT), -1, dtype=np.int32)
+    scores = np.zeros((len(rows), RELATED_COUNT), dtype=np.float32)
+    for start in range(0, len(rows), BLOCK_SIZE):
+        block = np.asarray(rows[start:start + BLOCK_SIZE])
+        similarities = vectors[block] @ vectors.T
+        similarities[np.arange(len(block)), block] = -np.inf  # a post isn't related to itself
+        indices[start:start + len(block)], scores[start:start + len(block)] = top_neighbors(similarities, RELATED_COUNT)
+    return indices, scores
+
+
+def load_cache():
+    """Load cached vectors and neighbors, or None if missing or unreadable."""
+    try:
+        with np.load(RELATED_CACHE_PATH, allow_pickle=False) as data:
+            cache = {name: data[name] for name in data.files}
+    except (OSError, ValueError, KeyError):
+        return None
+    if int(cache.get("version", -1)) != CACHE_VERSION:
+        return None
+    return cache
+
+
+def save_cache(cache):
+    """Write the cache atomically."""
+    BUILD_CACHE_DIR.mkdir(exist_ok=True)
+    tmp_path = RELATED_CACHE_PATH.with_suffix(".tmp.npz")
+    np.savez(tmp_path, version=CACHE_VERSION, **cache)
+    tmp_path.replace(RELATED_CACHE_PATH)
+
+
+def compute_related(posts, terms_by_post):
+    """Return {filename: [related filename, ...]} for every post.
+
+    Vectors are reused for posts whose terms are unchanged. Only changed
+    posts, and posts whose cached neighbors included a changed or removed
+    post, are rescored against the whole corpus. Every other post just
+    compares its cached neighbors with the changed posts. Vocabulary and
+    IDF stay fixed until the post count drifts by REFIT_DRIFT, then
+    everything is refit and rescored.
+    """
+    if np is None:
+        print("⚠ numpy not installed, skipping related posts")
+        return {}
+
+    filenames = [p["filename"] for p in posts]
+    keys = [terms_key(p) for p in posts]
+    post_count = len(posts)
+    cache = load_cache()
+    refit = (
+        cache is None
+        or abs(post_count - int(cache["fitted_count"])) > REFIT_DRIFT * int(cache["fitted_count"])
+    )
+
+    if refit:
+        vocabulary, idf = fit_vocabulary(terms_by_post)
+        fitted_count = post_count
+        vocabulary_index = {t: i for i, t in enumerate(vocabulary)}
+        vectors = np.zeros((post_count, len(idf)), dtype=np.float32)
+        for i, filename in enumerate(filenames):
+            vectors[i] = vectorize(terms_by_post[filename], vocabulary_index, idf)
+        changed = list(range(post_count))
+        indices, scores = score_rows(vectors, changed)
+        rescored = post_count
+    else:
+        vocabulary = [str(t) for t in cache["vocabulary"]]
+        idf = cache["idf"]
+        fitted_count = int(cache["fitted_count"])
+        vocabulary_index = {t: i for i, t in enumerate(vocabulary)}
+        old_filenames = [str(f) for f in cache["filenames"]]
+        old_position = {f: i for i, f in enumerate(old_filenames)}
+        old_keys = cache["keys"]
+        position = {f: i for i, f in enumerate(filenames)}
+
+        vectors = np.zeros((post_count, len(idf)), dtype=np.float32)
+        changed = []
+        for i, filename in enumerate(filenames):
+            j = old_position.get(filename)
+            if j is not None and old_keys[j] == keys[i]:
+                vectors[i] = cache["vectors"][j]
+            else:
+                vectors[i] = vectorize(terms_by_post[filename], vocabulary_index, idf)
+                changed.append(i)
+        stale = {filenames[i] for i in changed} | (old_position.keys() - position.keys())
+
+        # Carry over cached neighbor lists that don't involve a stale post
+        indices = np.full((post_count, RELATED_COUNT), -1, dtype=np.int32)
+        scores = np.zeros((post_count, RELATED_COUNT), dtype=np.float32)
+        rescore = set(changed)
+        for i, filename in enumerate(filenames):
+            if i in rescore:
+                continue
+            j = old_position[filename]
+            neighbors = [old_filenames[n] for n in cache["indices"][j] if n >= 0]
+            if any(n in stale for n in neighbors):
+                rescore.add(i)
+                continue
+            indices[i, :len(neighbors)] = [position[n] for n in neighbors]
+            scores[i] = cache["scores"][j]
+
+        rescore = sorted(rescore)
+        if rescore:
+            indices[rescore], scores[rescore] = score_rows(vectors, rescore)
+
+        # Everyone else only needs to check whether a changed post now beats their list
+        keep = np.setdiff1d(np.arange(post_count), rescore)
+        if changed and len(keep):
+            challenger_scores = (vectors[changed] @ vectors[keep].T).T
+            candidates = np.concatenate([indices[keep], np.broadcast_to(changed, challenger_scores.shape)], axis=1)
+            candidate_scores = np.concatenate([np.where(indices[keep] >= 0, scores[keep], -np.inf), challenger_scores], axis=1)
+            best, best_scores = top_neighbors(candidate_scores, RELATED_COUNT)
+            indices[keep] = np.where(best >= 0, np.take_along_axis(candidates, np.maximum(best, 0), axis=1), -1)
+            scores[keep] = best_scores
+        rescored = len(rescore)
+
+    save_cache({
+        "filenames": np.array(filenames, dtype=str),
+        "keys": np.array(keys, dtype=str),
+        "vocabulary": np.array(vocabulary, dtype=str),
+        "idf": idf,
+        "fitted_count": fitted_count,
+        "vectors": vectors,
+        "indices": indices,
+        "scores": scores,
+    })
+
+    mode = "full refit" if refit else f"{len(changed)} vectors updated"
+    print(f"✓ Scored related posts ({mode}, {rescored} of {post_count} posts rescored)")
+    return {
+        filename: [filenames[n] for n in indices[i] if n >= 0]
+        for i, filename in enumerate(filenames)
+    }
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Full-text search index for the Thunderclaw blog.
+Builds an inverted index over post titles, tags and bodies and writes it
+as small JSON shards keyed by term prefix, so the browser only downloads
+the shards a query needs.
+"""
+
+import re
+import json
+from pathlib import Path
+from build_cache import BUILD_CACHE_DIR
+from build_io import remove_output, write_output
+
+SEARCH_DIR = Path("search")
+TERMS_CACHE_PATH = BUILD_CACHE_DIR / "search-terms.json"
+INDEX_VERSION = 1
+SHARD_PREFIX_LENGTH = 2
+TITLE_WEIGHT = 5
+TAG_WEIGHT = 3
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from had has have how i if in
+into is it its just like more not of on or our so than that the their them
+then there these they this to was we what when which who why will with you
+your
+""".split())
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Split text into lowercase index terms, dropping stopwords and single characters."""
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def post_terms(post):
+    """Return {term: weight} for a post; title and tag hits count extra."""
+    terms = {}
+    for term in tokenize(post["body"]):
+        terms[term] = terms.get(term, 0) + 1
+    for term in tokenize(post["title"]):
+        terms[term] = terms.get(term, 0) + TITLE_WEIGHT
+    tags = post["tags"] if isinstance(post["tags"], list) else [post["tags"]]
+    for term in tokenize(" ".join(tags)):
+        terms[term] = terms.get(term, 0) + TAG_WEIGHT
+    return terms
+
+
+def terms_key(post):
+    """Return a string that changes whenever a post's terms could."""
+    return f'{post["body_hash"]}\0{post["title"]}\0{post["tags"]}'
+
+
+def load_terms_cache():
+    """Load cached per-post terms, keyed by filename."""
+    try:
+        with open(TERMS_CACHE_PATH, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache.get("posts", {}) if cache.get("version") == INDEX_VERSION else {}
+
+
+def shard_name(term):
+    """Return the shard a term lives in."""
+    return term[:SHARD_PREFIX_LENGTH]
+
+
+def load_post_terms(posts):
+    """Return {filename: {term: weight}} for every post, tokenizing each at most once.
+
+    Term weights are cached by body hash, title and tags, so unchanged
+    posts are never re-read.
+    """
+    cached = load_terms_cache()
+    fresh = {}
+    for post in posts:
+        key = terms_key(post)
+        entry = cached.get(post["filename"])
+        if not entry or entry["key"] != key:
+            entry = {"key": key, "terms": post_terms(post)}
+        fresh[post["filename"]] = entry
+
+    if fresh != cached:
+        BUILD_CACHE_DIR.mkdir(exist_ok=True)
+        write_output(TERMS_CACHE_PATH, json.dumps({"version": INDEX_VERSION, "posts": fresh}))
+    return {filename: entry["terms"] for filename, entry in fresh.items()}
+
+
+def build_search_index(posts, terms_by_post):
+    """Write search/docs.json and one search/<prefix>.json shard per term prefix.
+
+    terms_by_post comes from load_post_terms(). Document ids run oldest first,
+    so publishing a new post doesn't renumber the existing ones. Postings
+    are flat [id, weight, id, weight, ...] lists.
+    """
+    docs = []
+    shards = {}
+
+    for doc_id, post in enumerate(reversed(posts)):
+        docs.append([post["filename"], post["title"], post["date"]])
+        for term, weight in terms_by_post[post["filename"]].items():
+            shards.setdefault(shard_name(term), {}).setdefault(term, []).extend((doc_id, weight))
+
+    SEARCH_DIR.mkdir(exist_ok=True)
+    for name, terms in shards.items():
+        write_output(SEARCH_DIR / f"{name}.json", json.dumps(terms, sort_keys=True, separators=(",", ":")))
+
+    for stale in SEARCH_DIR.glob("*.json"):
+        if stale.stem != "docs" and stale.stem not in shards:
+            remove_output(stale)
+
+    write_output(SEARCH_DIR / "docs.json", json.dumps({
+        "version": INDEX_VERSION,
+        "prefix": SHARD_PREFIX_LENGTH,
+        "docs": docs,
+        "shards": sorted(shards),
+    }, ensure_ascii=False, separators=(",", ":")))
+
+    term_count = sum(len(terms) for terms in shards.values())
+    print(f"✓ Generated search index — {term_count} terms in {len(shards)} shards")
+
+
+SEARCH_JS = """(function() {
+    var input = document.getElementById('search-input');
+    var list = document.querySelector('.post-list');
+    var STOPWORDS = %(stopwords)s;
+    var meta = null;
+    var shards = {};
+
+    function fetchJSON(url) {
+        return fetch(url).then(function(r) { return r.json(); });
+    }
+
+    function tokenize(text) {
+        return (text.toLowerCase().match(/[a-z0-9]+/g) || []).filter(function(t) {
+            return t.length > 1 && STOPWORDS.indexOf(t) === -1;
+        });
+    }
+
+    function shard(name) {
+        if (meta.shards.indexOf(name) === -1) return Promise.resolve({});
+        if (!shards[name]) shards[name] = fetchJSON('/search/' + name + '.json');
+        return shards[name];
+    }
+
+    // Every query term must match; the last one also matches as a prefix while typing
+    function search(query) {
+        var terms = tokenize(query);
+        if (!terms.length) return Promise.resolve([]);
+        return Promise.all(terms.map(function(t) { return shard(t.slice(0, meta.prefix)); })).then(function(loaded) {
+            var scores = null;
+            terms.forEach(function(term, i) {
+                var termScores = {};
+                Object.keys(loaded[i]).forEach(function(candidate) {
+                    var exact = candidate === term;
+                    if (!exact && !(i === terms.length - 1 && candidate.indexOf(term) === 0)) return;
+                    var postings = loaded[i][candidate];
+                    var idf = Math.log(1 + meta.docs.length / (postings.length / 2));
+                    for (var p = 0; p < postings.length; p += 2) {
+                        termScores[postings[p]] = (termScores[postings[p]] || 0) + postings[p + 1] * idf * (exact ? 1 : 0.5);
+                    }
+                });
+                if (scores === null) {
+                    scores = termScores;
+                } else {
+                    Object.keys(scores).forEach(function(id) {
+                        if (termScores[id] === undefined) delete scores[id];
+                        else scores[id] += termScores[id];
+                    });
+                }
+            });
+            return Object.keys(scores).sort(function(a, b) { return scores[b] - scores[a]; }).slice(0, 25);
+        });
+    }
+
+    function render(ids, query) {
+        if (!ids.length) {
+            list.innerHTML = query ? '<li class="post-item"><p class="post-description">No posts match.</p></li>' : '';
+            return;
+        }
+        list.innerHTML = ids.map(function(id) {
+            var doc = meta.docs[id];
+            var li = document.createElement('li');
+            li.className = 'post-item';
+            li.innerHTML = '<div class="post-date"></div><h2 class="post-title"><a></a></h2>';
+            li.querySelector('.post-date').textContent = doc[2];
+            li.querySelector('a').textContent = doc[1];
+            li.querySelector('a').href = '/blog/' + doc[0];
+            return li.outerHTML;
+        }).join('');
+    }
+
+    var pending = 0;
+    function run() {
+        var query = input.value;
+        var ticket = ++pending;
+        search(query).then(function(ids) {
+            if (ticket === pending) render(ids, query);
+        });
+    }
+
+    fetchJSON('/search/docs.json').then(function(data) {
+        meta = data;
+        var q = new URLSearchParams(location.search).get('q');
+        if (q) input.value = q;
+        input.addEventListener('input', run);
+        run();
+    });
+})();
+""" % {"stopwords": json.dumps(sorted(STOPWORDS))}
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Local preview server with live reload for the Thunderclaw blog.
+Serves the site, polls the build inputs for changes, rebuilds and tells
+open pages to reload. Used by `python build.py watch`; `python build.py
+serve` serves the built site as it is.
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+POLL_INTERVAL = 0.1  # seconds between scans of the watched files
+SETTLE_DELAY = 0.05  # wait for editors that write a file in several steps
+LIVERELOAD_PATH = "/__livereload"
+LIVERELOAD_SCRIPT = f"""<script>
+(function() {{
+    var source = new EventSource("{LIVERELOAD_PATH}");
+    source.onmessage = function() {{ location.reload(); }};
+}})();
+</script>
+"""
+
+
+class ReloadBroadcaster:
+    """Wakes every waiting live-reload connection when a build finishes."""
+
+    def __init__(self):
+        self.generation = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(self, generation, timeout):
+        """Block until the generation moves past the given one; return the current one."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    """Static file handler that injects the reload script into HTML pages."""
+
+    broadcaster = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == LIVERELOAD_PATH:
+            self.stream_reload_events()
+            return
+
+        path = Path(self.translate_path(self.path))
+        if path.is_dir():
+            if not self.path.split("?", 1)[0].endswith("/"):
+                super().do_GET()  # let the base class redirect to the slash URL
+                return
+            path = path / "index.html"
+        if path.suffix != ".html" or not path.is_file():
+            super().do_GET()
+            return
+
+        html = path.read_text(encoding="utf-8")
+        if "</body>" in html:
+            html = html.replace("</body>", LIVERELOAD_SCRIPT + "</body>", 1)
+        else:
+            html += LIVERELOAD_SCRIPT
+        body = html.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_reload_events(self):
+        """Hold a Server-Sent Events stream open and send one event per rebuild."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        generation = self.broadcaster.generation
+        try:
+            while True:
+                current = self.broadcaster.wait(generation, timeout=15)
+                if current != generation:
+                    generation = current
+                    self.wfile.write(b"data: reload\n\n")
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def snapshot(sources):
+    """Map each watched file to its (mtime, size)."""
+    state = {}
+    for source in map(Path, sources):
+        paths = source.iterdir() if source.is_dir() else [source]
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            state[path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+
+def changed_paths(before, after):
+    """Return the set of paths added, removed or modified between two snapshots."""
+    return {path for path in before.keys() | after.keys() if before.get(path) != after.get(path)}
+
+
+def watch(rebuild, sources, code_paths=(), host="127.0.0.1", port=8000):
+    """Serve the current directory and rebuild whenever a watched file changes.
+
+    rebuild(changed) is called with the set of changed paths. Changes to
+    code_paths (the build scripts, which hold the templates) restart the
+    whole process so the new code is loaded.
+    """
+    broadcaster = ReloadBroadcaster()
+    handler = type("Handler", (LiveReloadHandler,), {"broadcaster": broadcaster})
+    server = ThreadingHTTPServer((host, port), partial(handler, directory=os.getcwd()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"👀 Watching for changes — serving http://{host}:{port}/ (Ctrl+C to stop)")
+
+    code_paths = {Path(p) for p in code_paths}
+    watched = list(sources) + list(code_paths)
+    state = snapshot(watched)
+    try:
+        while True:
+            time.sleep(POLL_INTERVAL)
+            current = snapshot(watched)
+            if current == state:
+                continue
+            time.sleep(SETTLE_DELAY)
+            current = snapshot(watched)
+            changed = changed_paths(state, current)
+            state = current
+
+            if changed & code_paths:
+                print("\n♻ Build code changed, restarting...")
+                server.server_close()
+                os.execv(sys.executable, [sys.executable] + sys.argv)
+
+            started = time.perf_counter()
+            try:
+                rebuild(changed)
+            except Exception as e:
+                print(f"❌ Rebuild failed: {e}")
+                continue
+            broadcaster.notify()
+            print(f"⚡ Rebuilt in {(time.perf_counter() - started) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        server.server_close()
+
+
+def serve(host="127.0.0.1", port=8000):
+    """Serve the current directory as it is, without watching or reloading."""
+    server = ThreadingHTTPServer((host, port), partial(SimpleHTTPRequestHandler, directory=os.getcwd()))
+    server.daemon_threads = True
+    print(f"🌐 Serving http://{host}:{port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped serving")
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the built Thunderclaw blog locally.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="port to serve on (default: 8000)")
+    args = parser.parse_args(argv)
+    serve(args.host, args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,100 +1,158 @@
 #!/usr/bin/env python3
 """
 Generate sitemap.xml for Thunderclaw website.
-Run this after build.py to include all generated pages.
+Builds the URL list from post metadata (no generated HTML is read) and
+streams it out, switching to a sitemap index past 50,000 URLs. build.py
+runs it as its sitemap target; this script regenerates it on its own.
 """
 
+import io
+import gzip
+import argparse
+from contextlib import ExitStack
 from pathlib import Path
 from datetime import datetime
-import re
+from html import escape
+from build_compress import compress_outputs
+from build_io import build_lock, open_output
+from post_index import load_posts
 
 SITE_URL = "https://thunderclawbot.github.io"
+SITEMAP_PATH = Path("sitemap.xml")
+MAX_URLS_PER_SITEMAP = 50000  # limit from the sitemaps.org protocol
 
 def get_file_mtime(path):
     """Get last modified time of file as ISO date."""
     mtime = path.stat().st_mtime
     return datetime.fromtimestamp(mtime).strftime("%Y-%m-%d")
 
-def extract_date_from_post(html_path):
-    """Extract date from blog post HTML if available."""
-    try:
-        with open(html_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        # Look for date in meta tag
-        match = re.search(r'<p class="meta">([A-Za-z]+ \d+, \d{4})', content)
-        if match:
-            date_str = match.group(1)
-            date = datetime.strptime(date_str, "%B %d, %Y")
-            return date.strftime("%Y-%m-%d")
-    except:
-        pass
-    return get_file_mtime(html_path)
-
-def generate_sitemap():
-    """Generate sitemap.xml with all pages."""
+def sitemap_urls(posts):
+    """Return (loc, lastmod, priority) for every page, from metadata only."""
     root = Path(".")
-    
     urls = []
-    
+
     # Homepage - highest priority
     index_path = root / "index.html"
     if index_path.exists():
-        urls.append({
-            "loc": f"{SITE_URL}/",
-            "lastmod": get_file_mtime(index_path),
-            "priority": "1.0"
-        })
-    
+        urls.append((f"{SITE_URL}/", get_file_mtime(index_path), "1.0"))
+
     # About page
     about_path = root / "about.html"
     if about_path.exists():
-        urls.append({
-            "loc": f"{SITE_URL}/about.html",
-            "lastmod": get_file_mtime(about_path),
-            "priority": "0.8"
-        })
-    
-    # Blog index
-    blog_index = root / "blog" / "index.html"
-    if blog_index.exists():
-        urls.append({
-            "loc": f"{SITE_URL}/blog/",
-            "lastmod": get_file_mtime(blog_index),
-            "priority": "0.9"
-        })
-    
+        urls.append((f"{SITE_URL}/about.html", get_file_mtime(about_path), "0.8"))
+
+    # Blog and lab archives change when their newest post does
+    if posts:
+        urls.append((f"{SITE_URL}/blog/", max(p["date"] for p in posts), "0.9"))
+    lab_posts = [p for p in posts if p["category"] == "lab"]
+    if lab_posts:
+        urls.append((f"{SITE_URL}/lab/", max(p["date"] for p in lab_posts), "0.8"))
+
     # Blog posts
-    blog_dir = root / "blog"
-    if blog_dir.exists():
-        for post in sorted(blog_dir.glob("*.html")):
-            if post.name == "index.html":
-                continue
-            
-            urls.append({
-                "loc": f"{SITE_URL}/blog/{post.name}",
-                "lastmod": extract_date_from_post(post),
-                "priority": "0.7"
-            })
-    
-    # Generate XML
-    xml_lines = ['<?xml version="1.0" encoding="UTF-8"?>']
-    xml_lines.append('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">')
-    
-    for url in urls:
-        xml_lines.append("  <url>")
-        xml_lines.append(f"    <loc>{url['loc']}</loc>")
-        xml_lines.append(f"    <lastmod>{url['lastmod']}</lastmod>")
-        xml_lines.append(f"    <priority>{url['priority']}</priority>")
-        xml_lines.append("  </url>")
-    
-    xml_lines.append("</urlset>")
-    
-    # Write to file
-    sitemap_path = root / "sitemap.xml"
-    with open(sitemap_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(xml_lines))
-    
-    print(f"✓ Generated sitemap.xml with {len(urls)} URLs")
+    for post in sorted(posts, key=lambda p: p["filename"]):
+        urls.append((f"{SITE_URL}/blog/{post['filename']}", post["date"], "0.7"))
+
+    return urls
+
+def open_sitemap(stack, path, gzip_copy):
+    """Open path (and path.gz) for streaming; returns a list of text outputs.
+
+    The .gz is opened first so it is committed after the XML; replacing the
+    XML removes its old compressed copies.
+    """
+    outputs = []
+    if gzip_copy:
+        raw = stack.enter_context(open_output(path.with_name(path.name + ".gz"), binary=True))
+        # mtime=0 keeps the gzip bytes identical when the XML is unchanged
+        compressed = stack.enter_context(gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0, compresslevel=9))
+        outputs.append(stack.enter_context(io.TextIOWrapper(compressed, encoding="utf-8", newline="")))
+    outputs.insert(0, stack.enter_context(open_output(path)))
+    return outputs
+
+def write_urlset(path, urls, gzip_copy=False):
+    """Stream one <urlset> sitemap file."""
+    with ExitStack() as stack:
+        outputs = open_sitemap(stack, path, gzip_copy)
+
+        def emit(line):
+            for out in outputs:
+                out.write(line)
+
+        emit('<?xml version="1.0" encoding="UTF-8"?>\n')
+        emit('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for loc, lastmod, priority in urls:
+            emit(f"  <url>\n    <loc>{escape(loc, quote=False)}</loc>\n    <lastmod>{lastmod}</lastmod>\n"
+                 f"    <priority>{priority}</priority>\n  </url>\n")
+        emit("</urlset>")
+
+def write_sitemap_index(path, parts, gzip_copy=False):
+    """Write a <sitemapindex> pointing at each (filename, lastmod) part."""
+    with ExitStack() as stack:
+        outputs = open_sitemap(stack, path, gzip_copy)
+        lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+                 '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+        for filename, lastmod in parts:
+            lines.append(f"  <sitemap>\n    <loc>{escape(f'{SITE_URL}/{filename}', quote=False)}</loc>\n"
+                         f"    <lastmod>{lastmod}</lastmod>\n  </sitemap>")
+        lines.append("</sitemapindex>")
+        for out in outputs:
+            out.write("\n".join(lines))
+
+def remove_stale_files(parts, suffixes):
+    """Delete sitemap parts left over from a larger site and compressed copies no longer written.
+
+    parts are the numbered part names still in use; suffixes are the
+    extensions ("" for the XML itself) being written for each file.
+    """
+    for path in SITEMAP_PATH.parent.glob(f"{SITEMAP_PATH.stem}*.xml*"):
+        base, suffix = path.name, ""
+        if path.suffix in (".gz", ".br"):
+            base, suffix = path.name[:-len(path.suffix)], path.suffix
+        if (base != SITEMAP_PATH.name and base not in parts) or suffix not in suffixes:
+            path.unlink()
+
+def generate_sitemap(posts=None, gzip_copy=False, compress=False):
+    """Generate sitemap.xml with all pages.
+
+    compress writes .gz/.br siblings for static hosts, like build.py --compress.
+    """
+    if posts is None:
+        posts = load_posts()
+    urls = sitemap_urls(posts)
+    suffixes = {""}
+    if gzip_copy or compress:
+        suffixes.add(".gz")
+    if compress:
+        suffixes.add(".br")
+
+    parts = []
+    if len(urls) <= MAX_URLS_PER_SITEMAP:
+        write_urlset(SITEMAP_PATH, urls, gzip_copy)
+        print(f"✓ Generated sitemap.xml with {len(urls)} URLs")
+    else:
+        index = []
+        for start in range(0, len(urls), MAX_URLS_PER_SITEMAP):
+            chunk = urls[start:start + MAX_URLS_PER_SITEMAP]
+            part_path = SITEMAP_PATH.with_name(f"{SITEMAP_PATH.stem}-{len(parts) + 1}.xml")
+            write_urlset(part_path, chunk, gzip_copy)
+            parts.append(part_path.name)
+            part_name = part_path.name + ".gz" if gzip_copy else part_path.name
+            index.append((part_name, max(lastmod for _, lastmod, _ in chunk)))
+        write_sitemap_index(SITEMAP_PATH, index, gzip_copy)
+        print(f"✓ Generated sitemap index with {len(urls)} URLs in {len(parts)} sitemaps")
+
+    remove_stale_files(set(parts), suffixes)
+    if compress:
+        compress_outputs([SITEMAP_PATH, *(SITEMAP_PATH.with_name(part) for part in parts)])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate sitemap.xml from post metadata.")
+    parser.add_argument("--gzip", action="store_true", help="also write gzipped .xml.gz sitemaps")
+    parser.add_argument("--compress", action="store_true",
+                        help="write .gz (and .br, with brotli installed) siblings for static hosting")
+    args = parser.parse_args(argv)
+    with build_lock():
+        generate_sitemap(gzip_copy=args.gzip, compress=args.compress)
 
 if __name__ == "__main__":
-    generate_sitemap()
+    main()
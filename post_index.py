@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Post metadata for the Thunderclaw blog.
+Parses frontmatter and keeps a cached index of every post's metadata, so
+tools that only need titles and dates never read post bodies.
+"""
+
+import os
+import re
+import json
+import hashlib
+import math
+from datetime import date
+from pathlib import Path
+from build_cache import BUILD_CACHE_DIR
+
+POSTS_DIR = Path("posts")
+INDEX_PATH = BUILD_CACHE_DIR / "post-index.json"
+# Bump when scan_frontmatter or the indexed fields change
+INDEX_VERSION = 4
+# Frontmatter keys and values that must be ISO dates
+DATE_KEYS = frozenset(["date"])
+KEY_RE = re.compile(r"([A-Za-z_][\w-]*)[ \t]*:(?:[ \t]+(.*))?$")
+DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+INLINE_ITEM_RE = re.compile(r"""((?:"(?:[^"\\]|\\.)*"|'(?:[^']|'')*'|[^,"'])+)(?:,|$)""")
+JSON_DECODER = json.JSONDecoder()
+# Whitespace before the body, then the leading "# Title" the template already renders
+BODY_START_RE = re.compile(r"\s*(?:#\s+.+\n+)?")
+# Markdown ![alt](src "title") images and raw <img src="..."> tags in post bodies
+IMAGE_REF_RE = re.compile(r'!\[[^\]]*\]\(\s*<?([^)\s>]+)>?(?:\s+"[^"]*")?\s*\)|<img\b[^>]*?\bsrc="([^"]+)"')
+
+
+class FrontmatterError(ValueError):
+    """A post's frontmatter isn't in the supported YAML subset; the message is file:line: problem."""
+
+    def __init__(self, source, line, message):
+        super().__init__(f"{source}:{line}: {message}")
+        self.source = source
+        self.line = line
+
+
+def _parse_scalar(value):
+    """Parse a quoted or plain scalar; plain values run to the end of the line."""
+    if value[:1] == '"':
+        if len(value) > 1 and value[-1] == '"' and '"' not in value[1:-1] and "\\" not in value:
+            return value[1:-1]
+        try:
+            parsed, end = JSON_DECODER.raw_decode(value)
+        except ValueError:
+            raise ValueError("unterminated or invalid double-quoted string") from None
+        if end != len(value):
+            raise ValueError(f"unexpected text after quoted string: {value[end:]!r}")
+        return parsed
+    if value[:1] == "'":
+        if len(value) < 2 or value[-1] != "'" or "'" in value[1:-1].replace("''", ""):
+            raise ValueError("unterminated or invalid single-quoted string")
+        return value[1:-1].replace("''", "'")
+    return value
+
+
+def _parse_inline_list(value):
+    """Parse [a, "b, c", 'd'] into a list of strings."""
+    if value[-1] != "]":
+        raise ValueError("inline list is missing its closing ]")
+    inner = value[1:-1]
+    if not inner.strip():
+        return []
+    if '"' not in inner and "'" not in inner:
+        items = [item.strip() for item in inner.split(",")]
+        if not all(items):
+            raise ValueError("empty item in inline list")
+        return items
+    matches = list(INLINE_ITEM_RE.finditer(inner))
+    if sum(len(match.group(0)) for match in matches) != len(inner) or inner.rstrip()[-1] == ",":
+        raise ValueError("malformed inline list")
+    items = [match.group(1).strip() for match in matches]
+    if not all(items):
+        raise ValueError("empty item in inline list")
+    return [_parse_scalar(item) for item in items]
+
+
+def _check_date(key, value):
+    """Require a real YYYY-MM-DD date; the value itself stays a string."""
+    if not isinstance(value, str) or not DATE_RE.fullmatch(value):
+        raise ValueError(f"{key} must be a YYYY-MM-DD date, got {value!r}")
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{key} is not a valid date: {value!r}") from None
+
+
+def scan_frontmatter(content, source="<string>"):
+    """Parse frontmatter in one pass; returns (metadata, body_start, body_end).
+
+    The body is content[body_start:body_end]: everything after the closing
+    ---, without surrounding whitespace or a leading H1 (the template
+    renders the title). Only the frontmatter lines are copied, never the
+    body. Supported: key: value pairs with plain, "double" or 'single'
+    quoted values, inline [a, b] and block (- item) lists, comments, blank
+    lines, and dates as YYYY-MM-DD. Anything else raises FrontmatterError
+    with the file and line. A leading UTF-8 byte order mark is skipped;
+    offsets still count it, so they index the file's text as read.
+    """
+    start = 1 if content[:1] == "\ufeff" else 0
+    end = len(content)
+    while end > start and content[end - 1].isspace():
+        end -= 1
+    opening = content.find("\n", start)
+    if opening < 0 or content[start:opening].rstrip() != "---":
+        if content[start:].rstrip() == "---":
+            raise FrontmatterError(source, 1, "frontmatter is never closed with ---")
+        return {}, BODY_START_RE.match(content, start, end).end(), end
+    
+    # The closing --- is the first line that is exactly --- (trailing spaces allowed)
+    closing = opening
+    while True:
+        closing = content.find("\n---", closing)
+        if closing < 0:
+            raise FrontmatterError(source, 1, "frontmatter is never closed with ---")
+        line_end = content.find("\n", closing + 4)
+        if line_end < 0:
+            line_end = len(content)
+        if not content[closing + 4:line_end].strip():
+            break
+        closing = line_end
+    
+    metadata = {}
+    block_key = None  # key whose block list - items may follow
+    number = 1
+    try:
+        for line in content[opening + 1:closing].split("\n"):
+            number += 1
+            match = KEY_RE.match(line)
+            if match:
+                key, value = match.groups()
+                if value and value[-1] in " \t\r":
+                    value = value.rstrip()
+                if key in metadata:
+                    raise ValueError(f"duplicate key {key!r}")
+                block_key = None
+                if not value:
+                    block_key = key
+                    value = ""  # stays empty unless - items follow
+                elif value[0] == "[":
+                    value = _parse_inline_list(value)
+                elif value[0] in "\"'":
+                    value = _parse_scalar(value)
+                if key in DATE_KEYS:
+                    _check_date(key, value)
+                metadata[key] = value
+                continue
+            
+            stripped = line.strip()
+            if not stripped or stripped[0] == "#":
+                continue
+            if stripped[0] == "-" and stripped[1:2] in ("", " ", "\t"):
+                if block_key is None or line[0] not in " \t":
+                    raise ValueError("list item outside an indented block list")
+                if not isinstance(metadata[block_key], list):
+                    metadata[block_key] = []
+                metadata[block_key].append(_parse_scalar(stripped[1:].lstrip()))
+            elif line[0] in " \t":
+                raise ValueError(f"unexpected indentation: {stripped!r}")
+            else:
+                raise ValueError(f"expected 'key: value', got {stripped!r}")
+    except ValueError as e:
+        raise FrontmatterError(source, number, str(e)) from None
+    
+    return metadata, BODY_START_RE.match(content, min(line_end, end), end).end(), end
+
+
+def parse_frontmatter(content, source="<string>"):
+    """Parse YAML frontmatter from markdown content; returns (metadata, body)."""
+    metadata, body_start, body_end = scan_frontmatter(content, source)
+    return metadata, content[body_start:body_end]
+
+
+def estimate_reading_time(text):
+    """Estimate reading time based on word count (200 words per minute)."""
+    words = len(re.findall(r'\w+', text))
+    minutes = math.ceil(words / 200)
+    return max(1, minutes)
+
+
+class Post(dict):
+    """A post's metadata; the markdown body is read from disk on first access.
+
+    body_offset is where the body starts, so the frontmatter isn't parsed
+    again; if the file changed since it was indexed, it is rescanned.
+    """
+
+    def __missing__(self, key):
+        if key != "body":
+            raise KeyError(key)
+        with open(self["source"], "r", encoding="utf-8") as f:
+            content = f.read()
+        body = content[self["body_offset"]:].rstrip()
+        if hashlib.sha256(body.encode("utf-8")).hexdigest() != self["body_hash"]:
+            _, body = parse_frontmatter(content, self["source"])
+        self["body"] = body
+        return body
+
+
+def image_refs(body):
+    """Return the image sources a post body references, in order, without duplicates."""
+    refs = (markdown_src or html_src for markdown_src, html_src in IMAGE_REF_RE.findall(body))
+    return list(dict.fromkeys(refs))
+
+
+def read_post(md_file):
+    """Read and parse a post file into a Post with its body already loaded."""
+    with open(md_file, "r", encoding="utf-8") as f:
+        content = f.read()
+    
+    metadata, body_start, body_end = scan_frontmatter(content, md_file.as_posix())
+    body = content[body_start:body_end]
+    
+    # Extract filename without extension
+    slug = md_file.stem
+    
+    # Category defaults to 'library'
+    category = metadata.get("category", "library")
+    
+    return Post(
+        source=md_file.as_posix(),
+        slug=slug,
+        filename=f"{slug}.html",
+        title=metadata.get("title", "Untitled"),
+        date=metadata.get("date", ""),
+        description=metadata.get("description", ""),
+        tags=metadata.get("tags", []),
+        category=category,
+        image=metadata.get("image", ""),
+        images=image_refs(body),
+        reading_time=estimate_reading_time(body),
+        body_hash=hashlib.sha256(body.encode("utf-8")).hexdigest(),
+        body_offset=body_start,
+        body=body,
+    )
+
+
+def load_index():
+    """Load the cached metadata index, or an empty one if missing or stale."""
+    try:
+        with open(INDEX_PATH, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if index.get("version") != INDEX_VERSION:
+        return {}
+    return index.get("posts", {})
+
+
+def save_index(entries):
+    """Write the metadata index atomically."""
+    BUILD_CACHE_DIR.mkdir(exist_ok=True)
+    tmp_path = INDEX_PATH.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "posts": entries}, f, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp_path, INDEX_PATH)
+
+
+def load_posts():
+    """Load all posts from posts/, newest first, without reading unchanged files.
+
+    Metadata comes from the index whenever a file's mtime and size match
+    the cached entry; only new or edited posts are read and parsed. Bodies
+    are loaded lazily, so callers that never touch post["body"] never read
+    a post file at all on a warm index.
+    """
+    cached = load_index()
+    entries = {}
+    posts = []
+    
+    for md_file in sorted(POSTS_DIR.glob("*.md")):
+        source = md_file.as_posix()
+        stat = md_file.stat()
+        entry = cached.get(source)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            post = Post(entry["post"])
+        else:
+            post = read_post(md_file)
+            entry = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "post": {k: v for k, v in post.items() if k != "body"},
+            }
+        entries[source] = entry
+        posts.append(post)
+    
+    if entries != cached:
+        save_index(entries)
+    
+    # Sort by date (newest first), then by slug descending for same-date posts
+    posts.sort(key=lambda p: (p["date"], p["slug"]), reverse=True)
+    
+    return posts
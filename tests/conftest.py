@@ -0,0 +1,22 @@
+"""Shared fixtures for the build script tests (run with: python -m pytest tests)."""
+
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+
+from build_bench import SITE_FILES, generate_corpus  # noqa: E402
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    """A synthetic site of 12 short posts with the real site files, as the working directory."""
+    generate_corpus(tmp_path, 12, body_words=120, code_density=0.3, seed=7)
+    for name in SITE_FILES:
+        shutil.copy(REPO / name, tmp_path / name)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
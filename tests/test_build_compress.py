@@ -0,0 +1,28 @@
+"""Precompressed siblings: none outlive the output they were made from."""
+
+import build
+from build_bench import generate_corpus
+from build_compress import COMPRESS_EXTENSIONS
+from build_io import SIBLING_SUFFIXES
+from generate_sitemap import SITEMAP_PATH
+
+
+def compressed_siblings():
+    for root in build.COMPRESS_PATHS + [SITEMAP_PATH]:
+        candidates = root.rglob("*") if root.is_dir() else root.parent.glob(f"{root.name}.*")
+        yield from (p for p in candidates if p.suffix in SIBLING_SUFFIXES)
+
+
+def test_shrinking_the_site_leaves_no_orphan_siblings(site):
+    generate_corpus(site, 60, body_words=80, seed=7)
+    build.build(build.parse_args(["--force", "--compress"]))
+    before = list(compressed_siblings())
+    assert any(p.parent.name.isdigit() for p in before)  # archive pages were compressed
+
+    for post in sorted((site / "posts").glob("*.md"))[10:]:
+        post.unlink()
+    build.build(build.parse_args([]))
+
+    orphans = [p for p in compressed_siblings()
+               if p.with_suffix("").suffix in COMPRESS_EXTENSIONS and not p.with_suffix("").exists()]
+    assert before and orphans == []
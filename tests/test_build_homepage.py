@@ -0,0 +1,21 @@
+"""update_homepage: marked regions of index.html."""
+
+import build
+
+
+def test_reading_region_is_optional(site, capsys):
+    build.update_index_html(build.load_posts())
+    out = capsys.readouterr().out
+    assert "⚠" not in out and "Updated index.html (lab, library)" in out
+
+    homepage = site / "index.html"
+    homepage.write_text(homepage.read_text(encoding="utf-8").replace(
+        "<!-- build:library -->", "<!-- build:reading --><!-- /build:reading -->\n<!-- build:library -->"),
+        encoding="utf-8")
+    build.update_index_html(build.load_posts())
+    assert "Currently Reading" in homepage.read_text(encoding="utf-8")
+
+
+def test_missing_region_warns_when_given_html(site, capsys):
+    assert build.update_homepage({"missing": "<p>hi</p>"}) == set()
+    assert "⚠ No <!-- build:missing --> region" in capsys.readouterr().out
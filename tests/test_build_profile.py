@@ -0,0 +1,59 @@
+"""BuildProfiler: nested phases, file writes and the build total."""
+
+import time
+
+import build
+from build_io import write_output
+from build_profile import BuildProfiler
+
+
+def phase(profiler, name):
+    return next(p for p in profiler.phases if p["name"] == name)
+
+
+def test_nested_phase_time_is_not_counted_twice(tmp_path):
+    profiler = BuildProfiler(enabled=True)
+    with profiler.phase("outer"):
+        time.sleep(0.05)
+        with profiler.phase("inner"):
+            time.sleep(0.05)
+    profiler.finish()
+
+    outer, inner = phase(profiler, "outer"), phase(profiler, "inner")
+    assert outer["elapsed"] >= 0.1
+    assert 0.04 < outer["wall"] < 0.09
+    assert 0.04 < inner["wall"] < 0.09
+    assert outer["peak"] is not None and inner["peak"] is None
+    assert sum(p["wall"] for p in profiler.phases) <= profiler.total
+
+
+def test_writes_are_their_own_line(tmp_path):
+    profiler = BuildProfiler(enabled=True)
+    with profiler.phase("generate"):
+        for i in range(20):
+            write_output(tmp_path / f"{i}.html", "x" * 100_000)
+    profiler.finish()
+
+    generate = phase(profiler, "generate")
+    assert profiler.write_time > 0
+    assert abs(generate["elapsed"] - generate["wall"] - profiler.write_time) < 1e-6
+
+
+def test_build_phases_add_up_to_the_total(site, monkeypatch):
+    import build_profile
+    profilers = []
+
+    class RecordingProfiler(BuildProfiler):
+        def __init__(self, enabled=False):
+            super().__init__(enabled)
+            profilers.append(self)
+
+    monkeypatch.setattr(build_profile, "BuildProfiler", RecordingProfiler)
+    build.build(build.parse_args(["--force", "--no-cache", "--profile"]))
+
+    profiler = profilers[0]
+    names = [p["name"] for p in profiler.phases]
+    assert names.count("post terms") == 1 and "related posts" in names
+    assert all(p["wall"] >= 0 for p in profiler.phases)
+    assert profiler.write_time > 0
+    assert 0 <= profiler.unattributed() < 0.1 * profiler.total
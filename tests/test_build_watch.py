@@ -0,0 +1,15 @@
+"""watch: a malformed post at startup is reported, not fatal."""
+
+import build
+import build_serve
+
+
+def test_watch_survives_a_malformed_post_at_startup(site, monkeypatch, capsys):
+    (site / "posts" / "00003-synthetic.md").write_text("---\ntitle: [unclosed\n---\nBody\n", encoding="utf-8")
+    watched = []
+    monkeypatch.setattr(build_serve, "watch", lambda rebuild, **kwargs: watched.append(kwargs))
+
+    build.watch(build.parse_args(["watch"]))
+
+    assert watched
+    assert "❌ posts/00003-synthetic.md:2:" in capsys.readouterr().out